@@ -1,13 +1,18 @@
 import os
-import struct
-import zlib
 import json
-import hashlib
-import shutil
+import time
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import tkinter.ttk as ttk
 
+from pod5_core import (
+    BUNDLE_FORMATS, DEFAULT_WORKERS, HASH_ALGORITHMS, IndexCache, Metrics, NameIndex, OperationCancelled,
+    extract_bundle, extract_pod5, import_pod5, repack_pod5, list_pod_files, set_index_cache, watch_pod5
+)
+from pod5_search import TextIndex
+
 # ==================================================
 # Configurações e Traduções
 # ==================================================
@@ -40,7 +45,28 @@ translations = {
          "select_pod_file": "Selecione o arquivo POD5",
          "select_folder": "Selecione a pasta",
          "list_tab_title": "Listagem",
-         "config_tab_title": "Configurações"
+         "config_tab_title": "Configurações",
+         "workers": "Threads de processamento:",
+         "hash_algo": "Algoritmo de hash:",
+         "compress_level": "Nível de compressão zlib (0 = desativado):",
+         "in_place": "Alterar o POD original (in-place)",
+         "repack": "Compactar",
+         "repack_success": "POD compactado. Bytes recuperados:",
+         "cancel": "Cancelar",
+         "cancelled": "Operação cancelada.",
+         "filter": "Filtro:",
+         "only": "Somente (nomes/globs, ;):",
+         "incremental": "Extração incremental",
+         "extract_summary": "Gravados: {written}, inalterados: {skipped}",
+         "dedup_summary": "Bytes economizados pela deduplicação: {dedup_saved}",
+         "phase_times": "Tempo por fase:",
+         "text_search": "Texto:",
+         "search": "Buscar",
+         "search_summary": "{count} ocorrência(s) em {entries} entrada(s).",
+         "watch": "Observar pasta",
+         "watch_started": "Observando a pasta: cada arquivo salvo atualiza o *_new.pod (Cancelar encerra).",
+         "watch_build": "{modified} entrada(s) gravada(s) em {output} ({seconds:.2f}s)",
+         "watch_stopped": "Observação da pasta encerrada."
     },
     "en": {
          "title": "POD5 Toolkit: Terminal Reality (By Heitor and Denis)",
@@ -67,7 +93,28 @@ translations = {
          "select_pod_file": "Select POD5 file",
          "select_folder": "Select folder",
          "list_tab_title": "File Listing",
-         "config_tab_title": "Settings"
+         "config_tab_title": "Settings",
+         "workers": "Worker threads:",
+         "hash_algo": "Hash algorithm:",
+         "compress_level": "zlib compression level (0 = off):",
+         "in_place": "Patch the original POD in place",
+         "repack": "Repack",
+         "repack_success": "POD repacked. Bytes reclaimed:",
+         "cancel": "Cancel",
+         "cancelled": "Operation cancelled.",
+         "filter": "Filter:",
+         "only": "Only (names/globs, ;):",
+         "incremental": "Incremental extraction",
+         "extract_summary": "Written: {written}, unchanged: {skipped}",
+         "dedup_summary": "Bytes saved by deduplication: {dedup_saved}",
+         "phase_times": "Time per phase:",
+         "text_search": "Text:",
+         "search": "Search",
+         "search_summary": "{count} match(es) in {entries} entry(ies).",
+         "watch": "Watch folder",
+         "watch_started": "Watching the folder: each saved file updates *_new.pod (Cancel stops).",
+         "watch_build": "{modified} entry(ies) written to {output} ({seconds:.2f}s)",
+         "watch_stopped": "Folder watch stopped."
     },
     "es": {
          "title": "POD5 Toolkit: Terminal Reality (Por Heitor y Denis)",
@@ -94,7 +141,28 @@ translations = {
          "select_pod_file": "Seleccione archivo POD5",
          "select_folder": "Seleccione carpeta",
          "list_tab_title": "Listado de Archivos",
-         "config_tab_title": "Configuraciones"
+         "config_tab_title": "Configuraciones",
+         "workers": "Hilos de procesamiento:",
+         "hash_algo": "Algoritmo de hash:",
+         "compress_level": "Nivel de compresión zlib (0 = desactivado):",
+         "in_place": "Modificar el POD original (in situ)",
+         "repack": "Compactar",
+         "repack_success": "POD compactado. Bytes recuperados:",
+         "cancel": "Cancelar",
+         "cancelled": "Operación cancelada.",
+         "filter": "Filtro:",
+         "only": "Solo (nombres/globs, ;):",
+         "incremental": "Extracción incremental",
+         "extract_summary": "Escritos: {written}, sin cambios: {skipped}",
+         "dedup_summary": "Bytes ahorrados por deduplicación: {dedup_saved}",
+         "phase_times": "Tiempo por fase:",
+         "text_search": "Texto:",
+         "search": "Buscar",
+         "search_summary": "{count} coincidencia(s) en {entries} entrada(s).",
+         "watch": "Vigilar carpeta",
+         "watch_started": "Vigilando la carpeta: cada archivo guardado actualiza el *_new.pod (Cancelar termina).",
+         "watch_build": "{modified} entrada(s) escrita(s) en {output} ({seconds:.2f}s)",
+         "watch_stopped": "Vigilancia de la carpeta terminada."
     }
 }
 
@@ -113,233 +181,38 @@ language_full_names = {
 }
 full_name_to_code = {v: k for k, v in language_full_names.items()}
 
-# Carregar e salvar configuração (idioma)
+# Carregar e salvar configuração (idioma e número de threads)
 def load_config():
+    config = {"language": "pt", "workers": DEFAULT_WORKERS, "hash_algo": "sha256", "compress_level": 6}
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-            return config.get("language", "pt")
-    return "pt"
+            config.update(json.load(f))
+    return config
 
-def save_config(lang):
+def save_config(config):
     with open(CONFIG_FILE, "w") as f:
-        json.dump({"language": lang}, f)
+        json.dump(config, f)
 
-current_language = load_config()
+config = load_config()
+current_language = config["language"]
 
 # ==================================================
-# Funções de Processamento POD5
+# Interface Gráfica com Notebook (Dark Mode)
 # ==================================================
 
-def calculate_hash(data):
-    return hashlib.sha256(data).hexdigest()
+# Intervalos da comunicação com a thread de trabalho
+POLL_INTERVAL_MS = 50
+PROGRESS_INTERVAL = 0.1
 
-def extract_pod5(input_file, output_dir, lang="pt"):
-    manifest = []
-    with open(input_file, 'rb') as f:
-        # Ler cabeçalho
-        idstring = f.read(4)
-        if idstring != b'POD5':
-            raise ValueError("Arquivo POD5 inválido")
+# Pasta de extração terminada em .zip/.tar: exporta/importa um único pacote
+BUNDLE_EXTENSIONS = tuple("." + fmt for fmt in BUNDLE_FORMATS)
 
-        f.seek(0x58)
-        files = struct.unpack('<I', f.read(4))[0]
-        
-        f.seek(0x108)
-        info_off = struct.unpack('<I', f.read(4))[0]
-        f.read(4)  # ZERO
-        names_size = struct.unpack('<I', f.read(4))[0]
-        
-        file_size = os.fstat(f.fileno()).st_size
-        names_off = file_size - names_size
-        entry_size = (names_off - info_off) // files
-
-        # Ler todas as entradas
-        entries = []
-        f.seek(info_off)
-        for _ in range(files):
-            name_off = struct.unpack('<I', f.read(4))[0]
-            zsize = struct.unpack('<I', f.read(4))[0]
-            offset = struct.unpack('<I', f.read(4))[0]
-            size = struct.unpack('<I', f.read(4))[0]
-            entries.append((name_off, zsize, offset, size))
-            f.seek(f.tell() + entry_size - 16)  # Pular o resto da entrada
-
-        # Processar cada arquivo e gerar o manifesto
-        for i, (name_off, zsize, offset, size) in enumerate(entries):
-            f.seek(names_off + name_off)
-            filename = ""
-            while True:
-                byte = f.read(1)
-                if byte == b'\x00' or not byte:
-                    break
-                filename += byte.decode('ascii')
-            
-            # Mantém o nome original para compatibilidade com o manifesto.
-            # Se necessário, outras adaptações podem ser feitas somente na interface.
-            
-            # Extrair dados
-            f.seek(offset)
-            if zsize == size:
-                data = f.read(size)
-            else:
-                data = zlib.decompress(f.read(zsize))
-            
-            file_hash = calculate_hash(data)
-            manifest.append({
-                "index": i,
-                "name": filename,
-                "original_zsize": zsize,
-                "original_size": size,
-                "original_offset": offset,
-                "hash": file_hash,
-                "compressed": (zsize != size)
-            })
-
-            # Salvar arquivo extraído
-            output_path = os.path.join(output_dir, filename)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'wb') as out_file:
-                out_file.write(data)
-
-    # Salvar manifesto
-    manifest_path = os.path.join(output_dir, "_manifest.json")
-    with open(manifest_path, 'w') as mf:
-        json.dump(manifest, mf, indent=2)
-
-def import_pod5(original_file, extracted_dir, manifest_path, progress_callback=None):
-    # Carrega o manifesto
-    with open(manifest_path, 'r') as mf:
-        manifest = json.load(mf)
-
-    # Ler todo o arquivo original
-    with open(original_file, 'rb') as f:
-        original_data = f.read()
-    original_file_size = len(original_data)
-    header = bytearray(original_data)
-
-    # Extrair informações do header:
-    info_off = struct.unpack('<I', header[0x108:0x10C])[0]
-    names_size = struct.unpack('<I', header[0x110:0x114])[0]
-    old_names_off = original_file_size - names_size
-
-    files = len(manifest)
-    entry_size = (old_names_off - info_off) // files
-
-    # Parte 1: Dados originais (até o início da tabela)
-    part1 = original_data[:info_off]
-
-    # Parte 3: Tabela de entradas original
-    original_table = bytearray(original_data[info_off:old_names_off])
-    new_table = bytearray(original_table)
-
-    # Determinar quais entradas foram modificadas
-    modified_data = {}
-    for item in manifest:
-        index = item['index']
-        file_path = os.path.join(extracted_dir, item['name'])
-        try:
-            with open(file_path, 'rb') as f:
-                current_data = f.read()
-        except Exception as e:
-            raise Exception(f"Erro ao ler '{item['name']}': {e}")
-        if calculate_hash(current_data) != item['hash']:
-            modified_data[index] = current_data
-
-    if not modified_data:
-        return False
-
-    # Parte 2: Novo bloco de dados para entradas modificadas.
-    part2 = bytearray()
-    new_offsets = {}
-    modified_keys = sorted(modified_data.keys())
-    total_modified = len(modified_keys)
-    for idx, index in enumerate(modified_keys):
-        new_data = modified_data[index]
-        new_offset = len(part1) + len(part2)
-        new_size = len(new_data)
-        new_offsets[index] = (new_offset, new_size)
-        part2.extend(new_data)
-        if progress_callback:
-            progress = (idx + 1) / total_modified * 100
-            progress_callback(progress, translations[current_language]['processing'])
-
-    # Parte 4: Seção de nomes (inalterada)
-    part4 = original_data[old_names_off:]
-
-    # Atualizar a tabela de entradas (Parte 3)
-    for i in range(files):
-        entry_offset_in_table = i * entry_size
-        if i in new_offsets:
-            new_off, new_size = new_offsets[i]
-            new_table[entry_offset_in_table + 4: entry_offset_in_table + 8] = struct.pack('<I', new_size)
-            new_table[entry_offset_in_table + 8: entry_offset_in_table + 12] = struct.pack('<I', new_off)
-            new_table[entry_offset_in_table + 12: entry_offset_in_table + 16] = struct.pack('<I', new_size)
-
-    new_info_off = len(part1) + len(part2)
-    new_file_data = bytearray()
-    new_file_data.extend(part1)
-    new_file_data.extend(part2)
-    new_file_data.extend(new_table)
-    new_file_data.extend(part4)
-    new_file_size = len(new_file_data)
-
-    new_file_data[0x108:0x10C] = struct.pack('<I', new_info_off)
-
-    base_name = os.path.splitext(original_file)[0]
-    new_file = f"{base_name}_new.pod"
-    with open(new_file, 'wb') as f:
-        f.write(new_file_data)
-
-    return True
-
-def list_pod_files(input_file):
-    """Retorna uma lista de dicionários com informações de cada entrada do arquivo POD."""
-    files_list = []
-    with open(input_file, 'rb') as f:
-        idstring = f.read(4)
-        if idstring != b'POD5':
-            raise ValueError("Arquivo POD5 inválido")
-        f.seek(0x58)
-        files = struct.unpack('<I', f.read(4))[0]
-        f.seek(0x108)
-        info_off = struct.unpack('<I', f.read(4))[0]
-        f.read(4)  # ZERO
-        names_size = struct.unpack('<I', f.read(4))[0]
-        file_size = os.fstat(f.fileno()).st_size
-        names_off = file_size - names_size
-        entry_size = (names_off - info_off) // files
-
-        entries = []
-        f.seek(info_off)
-        for _ in range(files):
-            name_off = struct.unpack('<I', f.read(4))[0]
-            zsize = struct.unpack('<I', f.read(4))[0]
-            offset = struct.unpack('<I', f.read(4))[0]
-            size = struct.unpack('<I', f.read(4))[0]
-            entries.append((name_off, zsize, offset, size))
-            f.seek(f.tell() + entry_size - 16)
-        for i, (name_off, zsize, offset, size) in enumerate(entries):
-            f.seek(names_off + name_off)
-            filename = ""
-            while True:
-                byte = f.read(1)
-                if byte == b'\x00' or not byte:
-                    break
-                filename += byte.decode('ascii')
-            files_list.append({
-                "index": i,
-                "name": filename,
-                "zsize": zsize,
-                "size": size,
-                "offset": offset,
-                "compressed": (zsize != size)
-            })
-    return files_list
+# Listagem: espera do filtro enquanto se digita e linhas roladas por giro da roda do mouse
+FILTER_DELAY_MS = 200
+WHEEL_ROWS = 3
+SEARCH_LIMIT = 100000
 
-# ==================================================
-# Interface Gráfica com Notebook (Dark Mode)
-# ==================================================
+LIST_COLUMNS = ("index", "name", "size", "zsize", "offset", "ratio", "compressed")
 
 class POD5ExtractorApp:
     def __init__(self, root):
@@ -358,7 +231,30 @@ class POD5ExtractorApp:
         
         self.input_file = tk.StringVar()
         self.extracted_dir = tk.StringVar()
+        self.in_place = tk.BooleanVar(value=False)
+        self.extract_patterns = tk.StringVar()
+        self.incremental = tk.BooleanVar(value=False)
+
+        # Operação em segundo plano (uma por vez)
+        self.task_thread = None
+        self.task_queue = queue.Queue()
+        self.cancel_event = threading.Event()
         self.list_file = tk.StringVar()
+        self.filter_var = tk.StringVar()
+        self.text_var = tk.StringVar()
+
+        # Estado da listagem: entradas, índice de nomes e a ordem exibida
+        self.list_entries = []
+        self.name_index = NameIndex([])
+        self.text_matches = None  # índices das entradas que contêm o texto buscado
+        self.sort_column = None
+        self.sort_reverse = False
+        self.view = []
+        self.view_top = 0      # posição em view da primeira linha exibida
+        self.rows = []         # linhas da Treeview, reaproveitadas ao rolar (ver draw_view)
+        self.shown = {}        # linha da Treeview -> entrada exibida nela
+        self.selected = set()  # entradas selecionadas, mesmo fora da parte visível
+        self.filter_job = None
         
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
@@ -381,13 +277,25 @@ class POD5ExtractorApp:
         self.root.title(translations[lang]['title'])
         self.lbl_input.config(text=translations[lang]['file_label'])
         self.lbl_extracted.config(text=translations[lang]['extracted_folder'])
+        self.lbl_only.config(text=translations[lang]['only'])
         self.btn_browse.config(text=translations[lang]['browse'])
         self.btn_select.config(text=translations[lang]['select'])
         self.btn_export.config(text=translations[lang]['export'])
         self.btn_import.config(text=translations[lang]['import'])
+        self.chk_in_place.config(text=translations[lang]['in_place'])
+        self.chk_incremental.config(text=translations[lang]['incremental'])
+        self.btn_repack.config(text=translations[lang]['repack'])
+        self.btn_watch.config(text=translations[lang]['watch'])
+        self.btn_cancel.config(text=translations[lang]['cancel'])
         self.btn_list_browse.config(text=translations[lang]['browse'])
         self.btn_list.config(text=translations[lang]['list_files'])
+        self.lbl_filter.config(text=translations[lang]['filter'])
+        self.lbl_text.config(text=translations[lang]['text_search'])
+        self.btn_search.config(text=translations[lang]['search'])
         self.lbl_config_lang.config(text=translations[lang]['choose_language'])
+        self.lbl_config_workers.config(text=translations[lang]['workers'])
+        self.lbl_config_hash.config(text=translations[lang]['hash_algo'])
+        self.lbl_config_level.config(text=translations[lang]['compress_level'])
         self.btn_apply.config(text=translations[lang]['apply'])
         self.notebook.tab(1, text=translations[lang]['list_tab_title'])
         self.notebook.tab(2, text=translations[lang]['config_tab_title'])
@@ -398,11 +306,87 @@ class POD5ExtractorApp:
         self.txt_log.see("end")
         self.txt_log.config(state="disabled")
     
+    def log_metrics(self, metrics):
+        self.log_message(translations[self.current_lang]['phase_times'])
+        for line in metrics.format_lines():
+            self.log_message("  " + line)
+
     def update_progress(self, value, message=""):
         self.progress_bar["value"] = value
         if message:
             self.log_message(message)
-        self.root.update_idletasks()
+
+    def set_busy(self, busy):
+        state = ["disabled"] if busy else ["!disabled"]
+        for button in (self.btn_export, self.btn_import, self.btn_repack, self.btn_watch, self.btn_list,
+                       self.btn_search):
+            button.state(state)
+        self.btn_cancel.state(["!disabled"] if busy else ["disabled"])
+
+    def run_task(self, task, on_success, error_message):
+        """Executa task(progress_callback, cancel_event) em uma thread de trabalho.
+
+        O progresso chega à interface por uma fila lida com root.after (no máximo uma
+        atualização a cada PROGRESS_INTERVAL; mensagens vão todas para o log);
+        on_success(resultado) roda na thread da interface.
+        """
+        if self.task_thread is not None:
+            return
+        task_queue = self.task_queue = queue.Queue()
+        cancel_event = self.cancel_event = threading.Event()
+        last_update = [0.0]
+
+        def progress(value, message=""):
+            if message:
+                task_queue.put(("log", message))
+            now = time.monotonic()
+            if value >= 100 or now - last_update[0] >= PROGRESS_INTERVAL:
+                last_update[0] = now
+                task_queue.put(("progress", value))
+
+        def target():
+            try:
+                task_queue.put(("done", task(progress, cancel_event)))
+            except OperationCancelled:
+                task_queue.put(("cancelled", None))
+            except Exception as e:
+                task_queue.put(("error", e))
+
+        self.set_busy(True)
+        self.progress_bar["value"] = 0
+        self.task_thread = threading.Thread(target=target, daemon=True)
+        self.task_thread.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_task, on_success, error_message)
+
+    def poll_task(self, on_success, error_message):
+        lang = self.current_lang
+        try:
+            while True:
+                kind, payload = self.task_queue.get_nowait()
+                if kind == "progress":
+                    self.update_progress(payload)
+                    continue
+                if kind == "log":
+                    self.log_message(payload)
+                    continue
+                self.task_thread = None
+                self.set_busy(False)
+                self.progress_bar["value"] = 0
+                if kind == "done":
+                    on_success(payload)
+                elif kind == "cancelled":
+                    self.log_message(translations[lang]['cancelled'])
+                else:
+                    messagebox.showerror(translations[lang]['error'], f"{error_message}:\n{str(payload)}")
+                    self.log_message(f"Erro: {str(payload)}")
+                return
+        except queue.Empty:
+            pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_task, on_success, error_message)
+
+    def cancel_task(self):
+        if self.task_thread is not None:
+            self.cancel_event.set()
     
     def create_main_tab(self):
         lang = self.current_lang
@@ -420,18 +404,38 @@ class POD5ExtractorApp:
         self.btn_select = ttk.Button(self.tab_main, text=translations[lang]['select'], command=self.browse_extracted)
         self.btn_select.grid(row=1, column=2, padx=5, pady=5)
         
+        self.lbl_only = tk.Label(self.tab_main, text=translations[lang]['only'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_only.grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.ent_only = tk.Entry(self.tab_main, textvariable=self.extract_patterns, width=50, bg="#4a4a4a", fg="#ffffff")
+        self.ent_only.grid(row=2, column=1, padx=5, pady=5)
+        
         self.btn_export = ttk.Button(self.tab_main, text=translations[lang]['export'], command=self.export_files)
-        self.btn_export.grid(row=2, column=0, padx=5, pady=10)
+        self.btn_export.grid(row=3, column=0, padx=5, pady=10)
         self.btn_import = ttk.Button(self.tab_main, text=translations[lang]['import'], command=self.import_files)
-        self.btn_import.grid(row=2, column=2, padx=5, pady=10)
+        self.btn_import.grid(row=3, column=2, padx=5, pady=10)
+        self.chk_in_place = tk.Checkbutton(self.tab_main, text=translations[lang]['in_place'], variable=self.in_place,
+                                           bg="#2e2e2e", fg="#ffffff", selectcolor="#4a4a4a",
+                                           activebackground="#2e2e2e", activeforeground="#ffffff")
+        self.chk_in_place.grid(row=3, column=1, padx=5, pady=10)
+        self.btn_repack = ttk.Button(self.tab_main, text=translations[lang]['repack'], command=self.repack_file)
+        self.btn_repack.grid(row=4, column=2, padx=5, pady=5)
+        self.btn_cancel = ttk.Button(self.tab_main, text=translations[lang]['cancel'], command=self.cancel_task)
+        self.btn_cancel.grid(row=4, column=0, padx=5, pady=5)
+        self.chk_incremental = tk.Checkbutton(self.tab_main, text=translations[lang]['incremental'], variable=self.incremental,
+                                              bg="#2e2e2e", fg="#ffffff", selectcolor="#4a4a4a",
+                                              activebackground="#2e2e2e", activeforeground="#ffffff")
+        self.chk_incremental.grid(row=4, column=1, padx=5, pady=5)
+        self.btn_cancel.state(["disabled"])
+        self.btn_watch = ttk.Button(self.tab_main, text=translations[lang]['watch'], command=self.watch_files)
+        self.btn_watch.grid(row=5, column=1, padx=5, pady=5)
         
         self.progress_bar = ttk.Progressbar(self.tab_main, orient="horizontal", length=400, mode="determinate")
-        self.progress_bar.grid(row=3, column=0, columnspan=3, padx=5, pady=5)
+        self.progress_bar.grid(row=6, column=0, columnspan=3, padx=5, pady=5)
         self.progress_bar["value"] = 0
         
         self.txt_log = tk.Text(self.tab_main, height=8, bg="#4a4a4a", fg="#ffffff", state="disabled")
-        self.txt_log.grid(row=4, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
-        self.tab_main.grid_rowconfigure(4, weight=1)
+        self.txt_log.grid(row=7, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
+        self.tab_main.grid_rowconfigure(7, weight=1)
     
     def create_list_tab(self):
         lang = self.current_lang
@@ -445,22 +449,51 @@ class POD5ExtractorApp:
         self.btn_list = ttk.Button(self.tab_list, text=translations[lang]['list_files'], command=self.list_files)
         self.btn_list.grid(row=1, column=1, padx=5, pady=5)
         
-        self.tree = ttk.Treeview(self.tab_list, columns=("index", "name", "size", "compressed"), show="headings")
-        self.tree.heading("index", text="Index")
-        self.tree.heading("name", text="Name")
-        self.tree.heading("size", text="Size")
-        self.tree.heading("compressed", text="Compressed")
+        self.lbl_filter = tk.Label(self.tab_list, text=translations[lang]['filter'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_filter.grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.ent_filter = tk.Entry(self.tab_list, textvariable=self.filter_var, width=50, bg="#4a4a4a", fg="#ffffff")
+        self.ent_filter.grid(row=2, column=1, padx=5, pady=5)
+        self.filter_var.trace_add("write", lambda *args: self.schedule_filter())
+        self.lbl_count = tk.Label(self.tab_list, text="", bg="#2e2e2e", fg="#ffffff")
+        self.lbl_count.grid(row=2, column=2, padx=5, pady=5)
+
+        self.lbl_text = tk.Label(self.tab_list, text=translations[lang]['text_search'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_text.grid(row=3, column=0, padx=5, pady=5, sticky="e")
+        self.ent_text = tk.Entry(self.tab_list, textvariable=self.text_var, width=50, bg="#4a4a4a", fg="#ffffff")
+        self.ent_text.grid(row=3, column=1, padx=5, pady=5)
+        self.ent_text.bind("<Return>", lambda event: self.search_text())
+        self.btn_search = ttk.Button(self.tab_list, text=translations[lang]['search'], command=self.search_text)
+        self.btn_search.grid(row=3, column=2, padx=5, pady=5)
+        
+        self.tree = ttk.Treeview(self.tab_list, columns=LIST_COLUMNS, show="headings")
+        headings = {"index": "Index", "name": "Name", "size": "Size", "zsize": "ZSize",
+                    "offset": "Offset", "ratio": "Ratio", "compressed": "Compressed"}
+        for column in LIST_COLUMNS:
+            self.tree.heading(column, text=headings[column], command=lambda c=column: self.sort_by(c))
         self.tree.column("index", width=50, anchor="center")
         self.tree.column("name", width=250)
         self.tree.column("size", width=80, anchor="center")
+        self.tree.column("zsize", width=80, anchor="center")
+        self.tree.column("offset", width=90, anchor="center")
+        self.tree.column("ratio", width=60, anchor="center")
         self.tree.column("compressed", width=80, anchor="center")
-        self.tree.grid(row=2, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
+        self.tree.grid(row=4, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
         
-        scrollbar = ttk.Scrollbar(self.tab_list, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=2, column=3, sticky="ns")
+        # A Treeview só tem as linhas visíveis; a barra de rolagem percorre self.view
+        self.list_scrollbar = ttk.Scrollbar(self.tab_list, orient="vertical", command=self.scroll_view)
+        self.list_scrollbar.grid(row=4, column=3, sticky="ns")
+        self.tree.bind("<Configure>", lambda event: self.resize_view(event.height))
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self.track_selection())
+        self.tree.bind("<MouseWheel>",
+                       lambda event: self.scroll_view("scroll", -WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_view("scroll", -WHEEL_ROWS, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_view("scroll", WHEEL_ROWS, "units"))
+        self.tree.bind("<Prior>", lambda event: self.scroll_view("scroll", -1, "pages"))
+        self.tree.bind("<Next>", lambda event: self.scroll_view("scroll", 1, "pages"))
+        self.tree.bind("<Up>", lambda event: self.step_view(-1))
+        self.tree.bind("<Down>", lambda event: self.step_view(1))
         
-        self.tab_list.grid_rowconfigure(2, weight=1)
+        self.tab_list.grid_rowconfigure(4, weight=1)
     
     def create_config_tab(self):
         lang = self.current_lang
@@ -472,8 +505,32 @@ class POD5ExtractorApp:
                                      values=list(language_full_names.values()))
         self.cmb_lang.grid(row=0, column=1, padx=5, pady=5)
         
+        self.lbl_config_workers = tk.Label(self.tab_config, text=translations[lang]['workers'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_config_workers.grid(row=1, column=0, padx=5, pady=5, sticky="e")
+
+        self.workers_var = tk.IntVar(value=config["workers"])
+        self.spn_workers = tk.Spinbox(self.tab_config, from_=1, to=64, textvariable=self.workers_var, width=5,
+                                      bg="#4a4a4a", fg="#ffffff")
+        self.spn_workers.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+
+        self.lbl_config_hash = tk.Label(self.tab_config, text=translations[lang]['hash_algo'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_config_hash.grid(row=2, column=0, padx=5, pady=5, sticky="e")
+
+        self.hash_var = tk.StringVar(value=config["hash_algo"])
+        self.cmb_hash = ttk.Combobox(self.tab_config, textvariable=self.hash_var, state="readonly",
+                                     values=list(HASH_ALGORITHMS))
+        self.cmb_hash.grid(row=2, column=1, padx=5, pady=5)
+
+        self.lbl_config_level = tk.Label(self.tab_config, text=translations[lang]['compress_level'], bg="#2e2e2e", fg="#ffffff")
+        self.lbl_config_level.grid(row=3, column=0, padx=5, pady=5, sticky="e")
+
+        self.level_var = tk.IntVar(value=config["compress_level"])
+        self.spn_level = tk.Spinbox(self.tab_config, from_=0, to=9, textvariable=self.level_var, width=5,
+                                    bg="#4a4a4a", fg="#ffffff")
+        self.spn_level.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
         self.btn_apply = ttk.Button(self.tab_config, text=translations[lang]['apply'], command=self.apply_config)
-        self.btn_apply.grid(row=1, column=0, columnspan=2, padx=5, pady=10)
+        self.btn_apply.grid(row=4, column=0, columnspan=2, padx=5, pady=10)
     
     def browse_pod5(self):
         lang = self.current_lang
@@ -509,14 +566,31 @@ class POD5ExtractorApp:
         if not input_path:
             messagebox.showerror(translations[lang]['error'], translations[lang]['select_pod_file'])
             return
-            
-        try:
-            extract_pod5(input_path, output_dir, lang)
+
+        workers, hash_algo = config["workers"], config["hash_algo"]
+        patterns = [p.strip() for p in self.extract_patterns.get().split(";") if p.strip()] or None
+        incremental = self.incremental.get()
+        metrics = Metrics()
+
+        def task(progress, cancel_event):
+            if output_dir.lower().endswith(BUNDLE_EXTENSIONS):
+                # Pasta informada como .zip/.tar: extrai para um único pacote
+                return extract_bundle(input_path, output_dir, lang, workers=workers, hash_algo=hash_algo,
+                                      progress_callback=progress, cancel_event=cancel_event, patterns=patterns,
+                                      metrics=metrics)
+            return extract_pod5(input_path, output_dir, lang, workers=workers, hash_algo=hash_algo,
+                                progress_callback=progress, cancel_event=cancel_event, patterns=patterns,
+                                incremental=incremental, metrics=metrics)
+
+        def done(result):
             messagebox.showinfo(translations[lang]['success'], f"{translations[lang]['file_extracted_success']}\n{output_dir}")
             self.log_message(f"{translations[lang]['export']} concluído.")
-        except Exception as e:
-            messagebox.showerror(translations[lang]['error'], f"Falha na extração:\n{str(e)}")
-            self.log_message(f"Erro: {str(e)}")
+            self.log_message(translations[lang]['extract_summary'].format(**result))
+            self.log_message(translations[lang]['dedup_summary'].format(**result))
+            self.log_metrics(metrics)
+
+        self.log_message(translations[lang]['processing'])
+        self.run_task(task, done, "Falha na extração")
     
     def import_files(self):
         lang = self.current_lang
@@ -524,57 +598,248 @@ class POD5ExtractorApp:
         extracted_path = self.extracted_dir.get()
         manifest_path = os.path.join(extracted_path, "_manifest.json")
         
-        if not os.path.exists(manifest_path):
+        if not os.path.isfile(extracted_path) and not os.path.exists(manifest_path):
             messagebox.showerror(translations[lang]['error'], translations[lang]['manifest_not_found'])
             return
-        
-        self.log_message(translations[lang]['importing_file'])
-        self.progress_bar["value"] = 0
-        try:
-            success = import_pod5(input_path, extracted_path, manifest_path, self.update_progress)
-            if success:
+
+        workers, compress_level, in_place = config["workers"], config["compress_level"], self.in_place.get()
+        metrics = Metrics()
+
+        def task(progress, cancel_event):
+            return import_pod5(input_path, extracted_path, manifest_path, progress,
+                               workers=workers, compress_level=compress_level,
+                               in_place=in_place, cancel_event=cancel_event, metrics=metrics)
+
+        def done(result):
+            if result:
                 messagebox.showinfo(translations[lang]['success'], translations[lang]['file_import_success'])
                 self.log_message(translations[lang]['file_import_success'])
+                self.log_message(translations[lang]['dedup_summary'].format(**result))
             else:
                 messagebox.showinfo(translations[lang]['success'], translations[lang]['no_modification'])
                 self.log_message(translations[lang]['no_modification'])
-        except Exception as e:
-            messagebox.showerror(translations[lang]['error'], f"Falha na importação:\n{str(e)}")
-            self.log_message(f"Erro: {str(e)}")
-        self.progress_bar["value"] = 0
+            self.log_metrics(metrics)
+
+        self.log_message(translations[lang]['importing_file'])
+        self.run_task(task, done, "Falha na importação")
     
+    def watch_files(self):
+        """Importa a pasta extraída e segue atualizando o *_new.pod a cada arquivo salvo, até Cancelar."""
+        lang = self.current_lang
+        input_path = self.input_file.get()
+        extracted_path = self.extracted_dir.get()
+        manifest_path = os.path.join(extracted_path, "_manifest.json")
+
+        if not os.path.isdir(extracted_path) or not os.path.exists(manifest_path):
+            messagebox.showerror(translations[lang]['error'], translations[lang]['manifest_not_found'])
+            return
+
+        workers, compress_level = config["workers"], config["compress_level"]
+
+        def task(progress, cancel_event):
+            def on_build(result):
+                if "error" in result:
+                    progress(0, f"Erro: {result['error']}")
+                else:
+                    progress(100, translations[lang]['watch_build'].format(**result))
+            return watch_pod5(input_path, extracted_path, manifest_path, workers=workers,
+                              compress_level=compress_level, on_build=on_build, cancel_event=cancel_event)
+
+        def done(result):
+            self.log_message(translations[lang]['watch_stopped'])
+
+        self.log_message(translations[lang]['watch_started'])
+        self.run_task(task, done, "Falha no modo watch")
+
+    def repack_file(self):
+        lang = self.current_lang
+        input_path = self.input_file.get()
+        if not input_path:
+            messagebox.showerror(translations[lang]['error'], translations[lang]['select_pod_file'])
+            return
+
+        def task(progress, cancel_event):
+            return repack_pod5(input_path, progress_callback=progress, cancel_event=cancel_event)
+
+        def done(result):
+            messagebox.showinfo(translations[lang]['success'], f"{translations[lang]['repack_success']} {result['reclaimed']}")
+            self.log_message(f"{translations[lang]['repack_success']} {result['reclaimed']}")
+
+        self.run_task(task, done, "Falha na compactação")
+
     def list_files(self):
         lang = self.current_lang
         file_path = self.list_file.get()
         if not file_path:
             messagebox.showerror(translations[lang]['error'], translations[lang]['select_pod_file'])
             return
-        try:
+
+        def task(progress, cancel_event):
             files = list_pod_files(file_path)
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            for file_info in files:
-                self.tree.insert("", "end", values=(
-                    file_info["index"],
-                    file_info["name"],
-                    file_info["size"],
-                    "Sim" if file_info["compressed"] else "Não"
-                ))
+            return files, NameIndex([file_info["name"] for file_info in files])
+
+        def done(result):
+            self.list_entries, self.name_index = result
+            self.text_matches = None
+            self.refresh_view()
             self.log_message("Listagem concluída.")
-        except Exception as e:
-            messagebox.showerror(translations[lang]['error'], f"Erro na listagem:\n{str(e)}")
-            self.log_message(f"Erro: {str(e)}")
-    
+
+        self.run_task(task, done, "Erro na listagem")
+
+    def search_text(self):
+        """Atualiza o índice de texto do POD listado e mostra só as entradas com o texto."""
+        lang = self.current_lang
+        file_path = self.list_file.get()
+        query = self.text_var.get().strip()
+        if not query:
+            self.text_matches = None
+            self.refresh_view()
+            return
+        if not file_path:
+            messagebox.showerror(translations[lang]['error'], translations[lang]['select_pod_file'])
+            return
+
+        def task(progress, cancel_event):
+            files = list_pod_files(file_path)
+            with TextIndex() as index:
+                index.update([file_path], progress_callback=progress, cancel_event=cancel_event)
+                results = index.search(query, archives=[file_path], limit=SEARCH_LIMIT)
+            return files, NameIndex([file_info["name"] for file_info in files]), results
+
+        def done(result):
+            self.list_entries, self.name_index, results = result
+            self.text_matches = {r["index"] for r in results}
+            self.refresh_view()
+            self.log_message(translations[lang]['search_summary'].format(
+                count=len(results), entries=len(self.text_matches)))
+
+        self.run_task(task, done, "Erro na busca de texto")
+
+    def schedule_filter(self):
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(FILTER_DELAY_MS, self.refresh_view)
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self.refresh_view()
+
+    def sort_key(self, column):
+        entries = self.list_entries
+        if column == "ratio":
+            return lambda i: entries[i]["zsize"] / entries[i]["size"] if entries[i]["size"] else 1.0
+        return lambda i: entries[i][column]
+
+    def refresh_view(self):
+        """Filtra e ordena o índice e volta a listagem para o início."""
+        self.filter_job = None
+        view = self.name_index.search(self.filter_var.get())
+        if self.text_matches is not None:
+            view = [i for i in view if self.list_entries[i]["index"] in self.text_matches]
+        if self.sort_column is not None:
+            view.sort(key=self.sort_key(self.sort_column), reverse=self.sort_reverse)
+        self.view = view
+        self.view_top = 0
+        self.selected = set()
+        self.lbl_count.config(text=f"{len(view)}/{len(self.list_entries)}")
+        self.draw_view()
+
+    def resize_view(self, height):
+        """Cria ou remove linhas da Treeview para preencher a altura disponível."""
+        rowheight = int(self.style.lookup("Treeview", "rowheight") or 20)
+        count = max(1, height // rowheight - 1)  # uma linha fica para o cabeçalho
+        while len(self.rows) < count:
+            self.rows.append(self.tree.insert("", "end"))
+        if len(self.rows) > count:
+            self.tree.delete(*self.rows[count:])
+            del self.rows[count:]
+        self.draw_view()
+
+    def draw_view(self):
+        """Reescreve as linhas da Treeview com as entradas de view a partir de view_top."""
+        self.view_top = max(0, min(self.view_top, len(self.view) - len(self.rows)))
+        self.shown = {}
+        selection = []
+        for k, row in enumerate(self.rows):
+            position = self.view_top + k
+            if position >= len(self.view):
+                self.tree.detach(row)
+                continue
+            i = self.view[position]
+            file_info = self.list_entries[i]
+            ratio = file_info["zsize"] / file_info["size"] if file_info["size"] else 1.0
+            self.tree.item(row, values=(
+                file_info["index"],
+                file_info["name"],
+                file_info["size"],
+                file_info["zsize"],
+                file_info["offset"],
+                f"{ratio:.2f}",
+                "Sim" if file_info["compressed"] else "Não"
+            ))
+            self.tree.move(row, "", k)
+            self.shown[row] = i
+            if i in self.selected:
+                selection.append(row)
+        self.tree.selection_set(selection)
+        if self.view:
+            self.list_scrollbar.set(self.view_top / len(self.view),
+                                    (self.view_top + len(self.shown)) / len(self.view))
+        else:
+            self.list_scrollbar.set(0, 1)
+
+    def scroll_view(self, action, amount, unit=None):
+        """Comando da barra de rolagem: ("moveto", fração) ou ("scroll", n, "units"/"pages")."""
+        if action == "moveto":
+            self.view_top = int(float(amount) * len(self.view))
+        else:
+            self.view_top += int(amount) * (max(1, len(self.rows) - 1) if unit == "pages" else 1)
+        self.draw_view()
+        return "break"
+
+    def step_view(self, step):
+        """Setas na primeira ou última linha visível rolam a listagem em vez de parar."""
+        rows = self.tree.get_children()
+        if not rows or self.tree.focus() != rows[0 if step < 0 else -1]:
+            return None
+        top = self.view_top
+        self.scroll_view("scroll", step, "units")
+        if self.view_top != top:
+            self.selected = {self.shown[self.tree.focus()]}
+            self.draw_view()
+        return "break"
+
+    def track_selection(self):
+        # As linhas fora da parte visível mantêm a seleção que tinham
+        visible = set(self.shown.values())
+        chosen = {self.shown[row] for row in self.tree.selection() if row in self.shown}
+        self.selected = (self.selected - visible) | chosen
+
     def apply_config(self):
         selected_full = self.lang_var.get()
         self.current_lang = full_name_to_code[selected_full]
         global current_language
         current_language = self.current_lang
-        save_config(self.current_lang)
+        config["language"] = self.current_lang
+        try:
+            config["workers"] = max(1, self.workers_var.get())
+        except tk.TclError:
+            self.workers_var.set(config["workers"])
+        try:
+            config["compress_level"] = min(9, max(0, self.level_var.get()))
+        except tk.TclError:
+            self.level_var.set(config["compress_level"])
+        config["hash_algo"] = self.hash_var.get()
+        save_config(config)
         self.update_texts()
         self.log_message("Configurações atualizadas.")
 
 if __name__ == "__main__":
+    # Tabela e nomes de cada POD aberto ficam em cache, para listagens repetidas instantâneas
+    set_index_cache(IndexCache())
     root = tk.Tk()
     app = POD5ExtractorApp(root)
     root.mainloop()
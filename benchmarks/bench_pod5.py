@@ -0,0 +1,222 @@
+"""Benchmark de list/extract/import/repack/verify sobre um POD5 sintético.
+
+Cada fase roda em um processo separado, para que o pico de memória (RSS) medido seja só
+o dela. Os resultados podem ser gravados em JSON (--output) e comparados com uma execução
+anterior (--compare).
+
+Uso:
+    python benchmarks/bench_pod5.py --entries 40000 --workers 1 8 --output resultados.json
+    python benchmarks/bench_pod5.py --entries 40000 --compare resultados.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pod5_core
+from synth_pod5 import generate
+
+def peak_rss():
+    """Pico de memória residente do processo atual, em bytes (None se indisponível)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except Exception:
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+# ==================================================
+# Fases (executadas no processo filho)
+# ==================================================
+
+def phase_list(ctx):
+    return len(pod5_core.list_pod_files(ctx["pod"]))
+
+def phase_extract(ctx):
+    shutil.rmtree(ctx["extracted"], ignore_errors=True)
+    return pod5_core.extract_pod5(ctx["pod"], ctx["extracted"], workers=ctx["workers"])["entries"]
+
+def phase_extract_incremental(ctx):
+    return pod5_core.extract_pod5(ctx["pod"], ctx["extracted"], workers=ctx["workers"], incremental=True)["entries"]
+
+def phase_import(ctx):
+    pod5_core.import_pod5(ctx["pod"], ctx["extracted"], ctx["manifest"], workers=ctx["workers"])
+    return ctx["entries"]
+
+def phase_import_in_place(ctx):
+    shutil.copyfile(ctx["pod"], ctx["copy"])
+    manifest = ctx["manifest"] + ".inplace"
+    shutil.copyfile(ctx["manifest"], manifest)
+    start = time.perf_counter()
+    pod5_core.import_pod5(ctx["copy"], ctx["extracted"], manifest, workers=ctx["workers"], in_place=True)
+    return ctx["entries"], time.perf_counter() - start  # desconta a cópia
+
+def phase_repack(ctx):
+    pod5_core.repack_pod5(ctx["pod"], ctx["copy"])
+    return ctx["entries"]
+
+def phase_verify(ctx):
+    return pod5_core.verify_pod5(ctx["pod"], workers=ctx["workers"])["entries"]
+
+# Fases que rodam com os arquivos alterados por modify_files
+MODIFIED_PHASES = ("import_modified", "import_in_place")
+
+PHASES = {
+    "list": phase_list,
+    "extract": phase_extract,
+    "extract_incremental": phase_extract_incremental,
+    "import_noop": phase_import,
+    "import_modified": phase_import,
+    "import_in_place": phase_import_in_place,
+    "repack": phase_repack,
+    "verify": phase_verify,
+}
+
+def _child(name, ctx, results):
+    start = time.perf_counter()
+    outcome = PHASES[name](ctx)
+    seconds = time.perf_counter() - start
+    if isinstance(outcome, tuple):
+        outcome, seconds = outcome
+    results.put((outcome, seconds, peak_rss()))
+
+def run_phase(name, ctx):
+    mp = multiprocessing.get_context("spawn")
+    results = mp.Queue()
+    process = mp.Process(target=_child, args=(name, ctx, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+def modify_files(extracted, fraction, seed=0):
+    """Altera uma fração dos arquivos extraídos (acrescentando bytes) e retorna quantos foram alterados."""
+    import random
+    rnd = random.Random(seed)
+    with open(os.path.join(extracted, "_manifest.json")) as mf:
+        manifest = json.load(mf)
+    chosen = rnd.sample(manifest, max(1, int(len(manifest) * fraction)))
+    for item in chosen:
+        with open(os.path.join(extracted, item["name"]), "ab") as f:
+            f.write(b" modified")
+    return len(chosen)
+
+# ==================================================
+# Execução
+# ==================================================
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="pod5_bench_", dir=args.tmpdir)
+    try:
+        pod = os.path.join(workdir, "bench.pod")
+        summary = generate(pod, args.entries, args.size_dist, args.compressibility, args.compressed_ratio,
+                           seed=args.seed)
+        mb = summary["bytes"] / (1024 * 1024)
+        ctx = {
+            "pod": pod,
+            "copy": os.path.join(workdir, "copy.pod"),
+            "extracted": os.path.join(workdir, "extracted"),
+            "manifest": os.path.join(workdir, "extracted", "_manifest.json"),
+            "entries": args.entries,
+        }
+
+        results = []
+        for workers in args.workers:
+            ctx["workers"] = workers
+            for name in PHASES:
+                if name == MODIFIED_PHASES[0]:
+                    modify_files(ctx["extracted"], args.modify, args.seed)
+                best = None
+                for _ in range(args.repeat):
+                    # O manifesto só é atualizado nas entradas inalteradas: toda rodada reimporta as alteradas
+                    entries, seconds, rss = run_phase(name, ctx)
+                    if best is None or seconds < best[1]:
+                        best = (entries, seconds, rss)
+                entries, seconds, rss = best
+                results.append({
+                    "phase": name,
+                    "workers": workers,
+                    "seconds": round(seconds, 4),
+                    "entries_per_s": round(entries / seconds, 1) if seconds else None,
+                    "mb_per_s": round(mb / seconds, 2) if seconds else None,
+                    "peak_rss": rss,
+                })
+                print(format_row(results[-1]), flush=True)
+                if name == MODIFIED_PHASES[-1]:
+                    # Restaura o estado inicial para a próxima configuração de workers
+                    run_phase("extract", ctx)
+
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {
+                "entries": args.entries,
+                "size_dist": args.size_dist,
+                "compressibility": args.compressibility,
+                "compressed_ratio": args.compressed_ratio,
+                "modify": args.modify,
+                "seed": args.seed,
+                "archive_bytes": summary["file_size"],
+                "payload_bytes": summary["bytes"],
+            },
+            "results": results,
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def format_row(row):
+    rss = f"{row['peak_rss'] / (1024 * 1024):8.1f} MB" if row["peak_rss"] else "       -"
+    return (f"{row['phase']:<20} w={row['workers']:<3} {row['seconds']:9.4f}s "
+            f"{row['entries_per_s'] or 0:12.1f} entradas/s {row['mb_per_s'] or 0:9.2f} MB/s  RSS {rss}")
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    old = {(row["phase"], row["workers"]): row for row in previous["results"]}
+    print(f"\nComparação com {previous_path} ({previous.get('timestamp')}):")
+    for row in current["results"]:
+        before = old.get((row["phase"], row["workers"]))
+        if before and row["seconds"]:
+            print(f"{row['phase']:<20} w={row['workers']:<3} {before['seconds']:9.4f}s -> {row['seconds']:9.4f}s "
+                  f"({before['seconds'] / row['seconds']:.2f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das operações do POD5 Toolkit")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--size-dist", default="lognormal:2048")
+    parser.add_argument("--compressibility", type=float, default=0.8)
+    parser.add_argument("--compressed-ratio", type=float, default=0.5)
+    parser.add_argument("--modify", type=float, default=0.01, help="fração de arquivos alterados em import_modified")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, pod5_core.DEFAULT_WORKERS])
+    parser.add_argument("--repeat", type=int, default=1, help="rodadas por fase (vale a mais rápida)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tmpdir", help="pasta para os arquivos temporários")
+    parser.add_argument("--keep", action="store_true", help="não apaga os arquivos gerados")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
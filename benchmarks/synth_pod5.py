@@ -0,0 +1,109 @@
+"""Gerador de arquivos POD5 sintéticos para testes e benchmarks.
+
+O layout segue o que pod5_core.PodArchive lê: magic "POD5", número de entradas em 0x58,
+info_off / ZERO / names_size em 0x108, dados, tabela de entradas e bloco de nomes no fim.
+
+Uso:
+    python benchmarks/synth_pod5.py saida.pod --entries 40000 --size-dist lognormal:2048
+"""
+import os
+import sys
+import math
+import zlib
+import random
+import struct
+import argparse
+
+HEADER_SIZE = 0x200
+
+WORDS = [
+    "the", "mission", "objective", "weapon", "ammo", "health", "checkpoint", "loading", "press", "start",
+    "continue", "options", "audio", "video", "controls", "save", "game", "level", "enemy", "ghost",
+    "vehicle", "door", "locked", "key", "found", "secret", "area", "complete", "failed", "retry",
+]
+
+def parse_size_dist(spec):
+    """Converte "fixed:N", "uniform:MIN-MAX" ou "lognormal:MEDIANA" em uma função rnd -> tamanho."""
+    kind, _, value = spec.partition(":")
+    if kind == "fixed":
+        size = int(value)
+        return lambda rnd: size
+    if kind == "uniform":
+        low, high = (int(v) for v in value.split("-"))
+        return lambda rnd: rnd.randint(low, high)
+    if kind == "lognormal":
+        mu = math.log(int(value))
+        return lambda rnd: max(1, int(rnd.lognormvariate(mu, 1.0)))
+    raise ValueError(f"Distribuição de tamanho inválida: {spec}")
+
+def make_payload(rnd, size, compressibility):
+    """Gera size bytes em que a fração compressibility é texto repetitivo e o resto é aleatório."""
+    text_size = int(size * compressibility)
+    parts = []
+    length = 0
+    while length < text_size:
+        word = rnd.choice(WORDS).encode() + b" "
+        parts.append(word)
+        length += len(word)
+    text = b"".join(parts)[:text_size]
+    return text + rnd.randbytes(size - text_size)
+
+def generate(path, entries=1000, size_dist="lognormal:2048", compressibility=0.8, compressed_ratio=0.5,
+             entry_size=16, dirs=16, seed=0):
+    """Grava um POD5 sintético em path e retorna um resumo (entradas e bytes)."""
+    if entry_size < 16:
+        raise ValueError("entry_size deve ser >= 16")
+    rnd = random.Random(seed)
+    sizes = parse_size_dist(size_dist)
+    table = bytearray()
+    names = bytearray()
+    total_size = 0
+
+    with open(path, "wb") as out:
+        out.write(b"POD5" + bytes(HEADER_SIZE - 4))
+        for i in range(entries):
+            data = make_payload(rnd, sizes(rnd), compressibility)
+            payload = data
+            if rnd.random() < compressed_ratio:
+                packed = zlib.compress(data, 6)
+                if len(packed) < len(data):
+                    payload = packed
+            offset = out.tell()
+            out.write(payload)
+            name = f"dir{i % dirs:03d}/entry_{i:06d}.lng".encode("ascii")
+            table += struct.pack("<4I", len(names), len(payload), offset, len(data))
+            table += bytes(entry_size - 16)
+            names += name + b"\x00"
+            total_size += len(data)
+
+        info_off = out.tell()
+        out.write(table)
+        out.write(names)
+        out.seek(0x58)
+        out.write(struct.pack("<I", entries))
+        out.seek(0x108)
+        out.write(struct.pack("<3I", info_off, 0, len(names)))
+
+    return {"entries": entries, "bytes": total_size, "file_size": os.path.getsize(path)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um arquivo POD5 sintético")
+    parser.add_argument("output")
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--size-dist", default="lognormal:2048",
+                        help="fixed:N, uniform:MIN-MAX ou lognormal:MEDIANA (bytes)")
+    parser.add_argument("--compressibility", type=float, default=0.8,
+                        help="fração de texto repetitivo em cada payload (0 a 1)")
+    parser.add_argument("--compressed-ratio", type=float, default=0.5,
+                        help="fração das entradas gravadas comprimidas")
+    parser.add_argument("--entry-size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    summary = generate(args.output, args.entries, args.size_dist, args.compressibility,
+                       args.compressed_ratio, args.entry_size, seed=args.seed)
+    print(f"{args.output}: {summary['entries']} entradas, {summary['bytes']} bytes "
+          f"(arquivo com {summary['file_size']} bytes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""Interface de linha de comando do POD5 Toolkit (não depende do tkinter).
+
+Uso:
+    python -m pod5_cli list    ARQUIVOS... [--json]
+    python -m pod5_cli extract ARQUIVOS... [--output-dir DIR] [--extracted-dir DIR] [--workers N]
+                                          [--only PADRÃO...] [--incremental] [--bundle zip|tar]
+                                          [--memory-limit MB] [--profile ARQ.json] [--cprofile ARQ.prof]
+    python -m pod5_cli import  ARQUIVOS... [--output-dir DIR] [--extracted-dir DIR] [--level N] [--in-place]
+                                          [--bundle zip|tar] [--profile ARQ.json] [--cprofile ARQ.prof]
+    python -m pod5_cli verify  ARQUIVOS... [--check-manifest] [--output-dir DIR] [--extracted-dir DIR]
+    python -m pod5_cli repack  ARQUIVOS... [--align N]
+    python -m pod5_cli make-patch  ARQUIVOS... [--new ARQ] [--patch ARQ] [--output-dir DIR]
+    python -m pod5_cli apply-patch ARQUIVOS... [--patch ARQ] [--output-dir DIR] [--in-place]
+    python -m pod5_cli index   ARQUIVOS... [--index ARQ.sqlite]
+    python -m pod5_cli search  TEXTO [--in ARQUIVO...] [--limit N] [--index ARQ.sqlite] [--json]
+    python -m pod5_cli watch   ARQUIVOS... [--output-dir DIR] [--extracted-dir DIR] [--level N] [--interval S]
+                                          [--debounce S]
+
+ARQUIVOS aceita padrões glob (ex.: "data/*.pod"); os arquivos são processados em
+paralelo, limitados por --jobs.
+
+A pasta extraída de cada POD é <nome>_extracted, ou <nome>_extraido se só esta existir
+(o padrão da interface gráfica em português e espanhol); --extracted-dir escolhe outra.
+
+--profile grava em JSON o tempo e os bytes de cada fase (ver pod5_core.Metrics) e os
+mostra na saída; --cprofile grava as estatísticas do cProfile (legíveis com pstats). Com
+--cprofile os arquivos são processados um de cada vez, e só a thread principal é
+perfilada: use --workers 1 para incluir todo o processamento.
+
+A tabela de entradas e os nomes de cada POD ficam em um cache de índice (ver
+pod5_core.IndexCache), o que torna instantâneas as leituras seguintes do mesmo arquivo;
+--no-index-cache desativa o cache.
+
+index grava as strings de todas as entradas em um índice de texto (ver
+pod5_search.TextIndex), atualizado só nas entradas que mudaram; search procura um texto
+(ou o início de um termo, com '*') nos POD indexados.
+
+watch importa a pasta extraída e continua atualizando o *_new.pod a cada arquivo salvo
+(ver pod5_core.PodWatcher) até Ctrl+C.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import cProfile
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from pod5_core import (
+    BUNDLE_FORMATS, DEFAULT_WORKERS, HASH_ALGORITHMS, PIPELINE_MEMORY, WATCH_DEBOUNCE, WATCH_INTERVAL, IndexCache,
+    Metrics, apply_patch, extract_bundle, extract_pod5, format_metrics, import_pod5, list_pod_files, make_patch,
+    repack_pod5, set_index_cache, verify_pod5, watch_pod5
+)
+from pod5_search import TextIndex
+
+def expand_archives(patterns):
+    """Expande os padrões glob, mantendo a ordem e removendo repetições."""
+    archives = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise ValueError(f"Nenhum arquivo corresponde a '{pattern}'")
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in archives:
+                archives.append(path)
+    return archives
+
+# Sufixos das pastas extraídas; a interface gráfica usa _extraido em português e espanhol
+EXTRACTED_SUFFIXES = ("_extracted", "_extraido")
+
+def extracted_dir_for(archive, args, extension=""):
+    """Pasta (ou pacote, com extension) extraída do POD: --extracted-dir, a que já existir ou <nome>_extracted."""
+    if args.extracted_dir:
+        return args.extracted_dir
+    base_dir = args.output_dir or os.path.dirname(archive)
+    stem = os.path.splitext(os.path.basename(archive))[0]
+    candidates = [os.path.join(base_dir, stem + suffix + extension) for suffix in EXTRACTED_SUFFIXES]
+    return next((path for path in candidates if os.path.exists(path)), candidates[0])
+
+def patch_path_for(archive, args):
+    if args.patch:
+        return args.patch
+    base_dir = args.output_dir or os.path.dirname(archive)
+    stem = os.path.splitext(os.path.basename(archive))[0]
+    return os.path.join(base_dir, stem + ".pod5patch")
+
+# ==================================================
+# Comandos (cada um recebe o caminho do POD e retorna um dicionário de resultado)
+# ==================================================
+
+def cmd_list(archive, args):
+    return {"entries": list_pod_files(archive)}
+
+def metrics_for(args):
+    return Metrics() if args.profile else None
+
+def cmd_extract(archive, args):
+    metrics = metrics_for(args)
+    if args.bundle:
+        if args.incremental:
+            raise ValueError("--incremental não pode ser usado com --bundle")
+        output_dir = extracted_dir_for(archive, args, "." + args.bundle)
+        result = extract_bundle(archive, output_dir, workers=args.workers, hash_algo=args.hash_algo,
+                                patterns=args.only, metrics=metrics, memory_limit=args.memory_limit * 1024 * 1024)
+    else:
+        output_dir = extracted_dir_for(archive, args)
+        result = extract_pod5(archive, output_dir, workers=args.workers, hash_algo=args.hash_algo,
+                              patterns=args.only, incremental=args.incremental, metrics=metrics,
+                              memory_limit=args.memory_limit * 1024 * 1024)
+    result["output"] = output_dir
+    if metrics:
+        result["metrics"] = metrics.as_dict()
+    return result
+
+def cmd_import(archive, args):
+    if args.bundle:
+        extracted_dir = extracted_dir_for(archive, args, "." + args.bundle)
+        manifest_path = None
+        if not os.path.isfile(extracted_dir):
+            raise FileNotFoundError(f"Pacote não encontrado: {extracted_dir}")
+    else:
+        extracted_dir = extracted_dir_for(archive, args)
+        manifest_path = os.path.join(extracted_dir, "_manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Manifesto não encontrado: {manifest_path}")
+    metrics = metrics_for(args)
+    result = import_pod5(archive, extracted_dir, manifest_path, workers=args.workers,
+                         compress_level=args.level, in_place=args.in_place, metrics=metrics)
+    if not result:
+        result = {"modified": 0, "dedup_saved": 0, "output": None}
+    else:
+        result["output"] = archive if args.in_place else f"{os.path.splitext(archive)[0]}_new.pod"
+    if metrics:
+        result["metrics"] = metrics.as_dict()
+    return result
+
+def cmd_verify(archive, args):
+    manifest_path = None
+    if args.check_manifest:
+        manifest_path = os.path.join(extracted_dir_for(archive, args), "_manifest.json")
+    return verify_pod5(archive, manifest_path, workers=args.workers)
+
+def cmd_repack(archive, args):
+    return repack_pod5(archive, alignment=args.align)
+
+def cmd_make_patch(archive, args):
+    new_file = args.new or f"{os.path.splitext(archive)[0]}_new.pod"
+    patch_file = patch_path_for(archive, args)
+    result = make_patch(archive, new_file, patch_file)
+    result["output"] = patch_file
+    return result
+
+def cmd_apply_patch(archive, args):
+    return apply_patch(archive, patch_path_for(archive, args), in_place=args.in_place)
+
+def cmd_index(archive, args):
+    with TextIndex(args.index) as index:
+        return index.update([archive])
+
+COMMANDS = {
+    "list": cmd_list,
+    "extract": cmd_extract,
+    "import": cmd_import,
+    "verify": cmd_verify,
+    "repack": cmd_repack,
+    "make-patch": cmd_make_patch,
+    "apply-patch": cmd_apply_patch,
+    "index": cmd_index,
+}
+
+def run_one(archive, args, profiler=None):
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(COMMANDS[args.command], archive, args)
+        else:
+            result = COMMANDS[args.command](archive, args)
+        ok = not result.get("errors")
+    except Exception as e:
+        result = {"error": str(e)}
+        ok = False
+    result.update({"archive": archive, "command": args.command, "ok": ok,
+                   "seconds": round(time.perf_counter() - start, 3)})
+    return result
+
+def format_result(result):
+    """Texto legível para um resultado (usado quando --json não é informado)."""
+    text = _format_summary(result)
+    if "metrics" in result:
+        text += "".join(f"\n  {line}" for line in format_metrics(result["metrics"]))
+    return text
+
+def _format_summary(result):
+    archive = result["archive"]
+    if "error" in result:
+        return f"{archive}: ERRO: {result['error']}"
+    timing = f"({result['seconds']:.2f}s)"
+    command = result["command"]
+    if command == "list":
+        lines = [f"== {archive} {timing}"]
+        for e in result["entries"]:
+            flag = "z" if e["compressed"] else "-"
+            lines.append(f"{e['index']:6d} {flag} {e['size']:10d} {e['zsize']:10d} {e['offset']:10d}  {e['name']}")
+        return "\n".join(lines)
+    if command == "extract":
+        return (f"{archive}: {result['written']} gravadas ({result['bytes']} bytes), {result['skipped']} inalteradas "
+                f"({result['skipped_bytes']} bytes) -> {result['output']} {timing}")
+    if command == "import":
+        if not result["modified"]:
+            return f"{archive}: nenhum arquivo modificado {timing}"
+        return (f"{archive}: {result['modified']} entradas atualizadas, {result['dedup_saved']} bytes "
+                f"deduplicados -> {result['output']} {timing}")
+    if command == "verify":
+        lines = [f"{archive}: {result['entries']} entradas ({result['shared']} com dados compartilhados), "
+                 f"{len(result['errors'])} erro(s) {timing}"]
+        lines.extend(f"  {error}" for error in result["errors"])
+        return "\n".join(lines)
+    if command == "make-patch":
+        return (f"{archive}: {result['entries']} entradas alteradas, patch de {result['patch_size']} bytes "
+                f"-> {result['output']} {timing}")
+    if command == "apply-patch":
+        return f"{archive}: {result['entries']} entradas aplicadas -> {result['output']} {timing}"
+    if command == "index":
+        return (f"{archive}: {result['indexed']} entradas indexadas, {result['binary']} binárias (sem texto), "
+                f"{result['kept']} inalteradas, "
+                f"{result['removed']} removidas {timing}")
+    if command == "repack":
+        return f"{archive}: {result['old_size']} -> {result['new_size']} bytes ({result['reclaimed']} recuperados) {timing}"
+    return f"{archive}: {result}"
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pod5_cli", description="POD5 Toolkit: Terminal Reality (linha de comando)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("archives", nargs="+", metavar="ARQUIVO", help="arquivos POD5 ou padrões glob")
+    common.add_argument("-j", "--jobs", type=int, default=1, help="arquivos processados em paralelo")
+    common.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="threads por arquivo")
+    common.add_argument("--json", action="store_true", help="saída em JSON")
+    common.add_argument("--no-index-cache", action="store_true", help="não usa o cache de índice dos POD")
+
+    folders = argparse.ArgumentParser(add_help=False)
+    folders.add_argument("-o", "--output-dir", help="pasta onde ficam as pastas <nome>_extracted "
+                                                    "(padrão: a pasta de cada POD)")
+    extracted = argparse.ArgumentParser(add_help=False, parents=[folders])
+    extracted.add_argument("--extracted-dir", metavar="DIR",
+                           help="pasta (ou pacote) extraída, em vez de <nome>_extracted ou <nome>_extraido "
+                                "(só com um POD)")
+
+    bundles = argparse.ArgumentParser(add_help=False)
+    bundles.add_argument("--bundle", choices=BUNDLE_FORMATS,
+                         help="usa um único pacote <nome>_extracted.zip/.tar em vez da pasta")
+
+    subparsers.add_parser("list", parents=[common], help="lista as entradas")
+
+    profiling = argparse.ArgumentParser(add_help=False)
+    profiling.add_argument("--profile", metavar="ARQ.json",
+                           help="grava o tempo e os bytes de cada fase em JSON")
+    profiling.add_argument("--cprofile", metavar="ARQ.prof", help="grava as estatísticas do cProfile")
+
+    p = subparsers.add_parser("extract", parents=[common, extracted, bundles, profiling], help="extrai as entradas e o manifesto")
+    p.add_argument("--hash-algo", choices=list(HASH_ALGORITHMS), default="sha256")
+    p.add_argument("--only", action="append", metavar="PADRÃO",
+                   help="extrai só as entradas com este nome ou glob (pode ser repetido)")
+    p.add_argument("--incremental", action="store_true",
+                   help="pula entradas que já estão atualizadas na pasta de destino")
+    p.add_argument("--memory-limit", type=int, default=PIPELINE_MEMORY // (1024 * 1024), metavar="MB",
+                   help="limite de dados em trânsito entre leitura, descompressão e gravação")
+
+    p = subparsers.add_parser("import", parents=[common, extracted, bundles, profiling], help="reimporta os arquivos modificados")
+    p.add_argument("--level", type=int, choices=range(10), default=6, metavar="0-9",
+                   help="nível de compressão zlib (0 = sem recompressão)")
+    p.add_argument("--in-place", action="store_true", help="altera o próprio POD em vez de gerar *_new.pod")
+
+    p = subparsers.add_parser("verify", parents=[common, extracted],
+                              help="confere trechos, sobreposições, nomes e descompressão sem extrair")
+    p.add_argument("--check-manifest", action="store_true",
+                   help="compara os hashes com o _manifest.json da pasta extraída")
+
+    p = subparsers.add_parser("repack", parents=[common], help="remove o espaço morto do POD")
+    p.add_argument("--align", type=int, default=1, help="alinhamento dos dados em bytes")
+
+    patches = argparse.ArgumentParser(add_help=False)
+    patches.add_argument("--patch", help="arquivo de patch (padrão: <nome>.pod5patch; só com um POD)")
+
+    p = subparsers.add_parser("make-patch", parents=[common, folders, patches],
+                              help="gera um patch com as diferenças entre o POD e o *_new.pod")
+    p.add_argument("--new", help="POD modificado (padrão: <nome>_new.pod; só com um POD)")
+
+    p = subparsers.add_parser("apply-patch", parents=[common, folders, patches], help="aplica um patch ao POD")
+    p.add_argument("--in-place", action="store_true", help="altera o próprio POD em vez de gerar *_new.pod")
+
+    text_index = argparse.ArgumentParser(add_help=False)
+    text_index.add_argument("--index", metavar="ARQ.sqlite",
+                            help="índice de texto (padrão: search.sqlite na pasta de cache)")
+
+    subparsers.add_parser("index", parents=[common, text_index], help="indexa as strings das entradas para busca")
+
+    p = subparsers.add_parser("search", parents=[text_index], help="procura um texto nos POD indexados")
+    p.add_argument("query", metavar="TEXTO", help="termos em sequência; 'term*' procura por prefixo")
+    p.add_argument("--in", dest="archives", nargs="+", metavar="ARQUIVO", help="procura só nestes POD")
+    p.add_argument("--limit", type=int, default=1000, help="número máximo de ocorrências")
+    p.add_argument("--json", action="store_true", help="saída em JSON")
+
+    p = subparsers.add_parser("watch", parents=[common, extracted],
+                              help="atualiza o *_new.pod a cada arquivo salvo na pasta extraída")
+    p.add_argument("--level", type=int, choices=range(10), default=6, metavar="0-9",
+                   help="nível de compressão zlib (0 = sem recompressão)")
+    p.add_argument("--interval", type=float, default=WATCH_INTERVAL, metavar="S",
+                   help="intervalo entre as verificações da pasta, em segundos")
+    p.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, metavar="S",
+                   help="tempo sem novas alterações antes de gravar, em segundos")
+    return parser
+
+def run_search(args):
+    start = time.perf_counter()
+    with TextIndex(args.index) as index:
+        results = index.search(args.query, archives=args.archives, limit=args.limit)
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        for r in results:
+            print(f"{r['archive']}: {r['index']:6d} {r['offset']:10d}  {r['name']}")
+        print(f"{len(results)} ocorrência(s) ({time.perf_counter() - start:.3f}s)", file=sys.stderr)
+    return 0 if results else 1
+
+def run_watch(args, archives):
+    """Observa cada POD em uma thread até Ctrl+C."""
+    stop = threading.Event()
+    failed = []
+
+    def watch(archive):
+        extracted_dir = extracted_dir_for(archive, args)
+
+        def on_build(result):
+            if args.json:
+                print(json.dumps(dict(result, archive=archive)), flush=True)
+            elif "error" in result:
+                print(f"{archive}: ERRO: {result['error']}", file=sys.stderr, flush=True)
+            else:
+                print(f"{archive}: {result['modified']} entradas -> {result['output']} ({result['seconds']:.2f}s)",
+                      flush=True)
+
+        try:
+            watch_pod5(archive, extracted_dir, os.path.join(extracted_dir, "_manifest.json"),
+                       workers=args.workers, compress_level=args.level, on_build=on_build,
+                       cancel_event=stop, interval=args.interval, debounce=args.debounce)
+        except Exception as e:
+            failed.append(archive)
+            print(f"{archive}: ERRO: {e}", file=sys.stderr, flush=True)
+
+    threads = [threading.Thread(target=watch, args=(archive,)) for archive in archives]
+    for thread in threads:
+        thread.start()
+    try:
+        # Espera com sleep: um join interrompido pelo Ctrl+C pode dar a thread como encerrada
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "search":
+        return run_search(args)
+    try:
+        archives = expand_archives(args.archives)
+    except ValueError as e:
+        parser.error(str(e))
+    if getattr(args, "extracted_dir", None) and len(archives) > 1:
+        parser.error("--extracted-dir só pode ser usado com um POD")
+
+    if not args.no_index_cache:
+        set_index_cache(IndexCache())
+    if args.command == "watch":
+        return run_watch(args, archives)
+    args.profile = getattr(args, "profile", None)
+    cprofile_path = getattr(args, "cprofile", None)
+    profiler = cProfile.Profile() if cprofile_path else None
+    # O cProfile só acompanha uma thread por vez: com --cprofile os arquivos rodam em sequência
+    jobs = 1 if profiler else max(1, args.jobs)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = []
+        for result in executor.map(lambda archive: run_one(archive, args, profiler), archives):
+            results.append(result)
+            if not args.json:
+                stream = sys.stdout if result["ok"] or "error" not in result else sys.stderr
+                print(format_result(result), file=stream, flush=True)
+
+    if profiler:
+        profiler.dump_stats(cprofile_path)
+    if args.profile:
+        profile = [{key: result.get(key) for key in ("archive", "command", "seconds", "metrics")}
+                   for result in results]
+        with open(args.profile, "w") as f:
+            json.dump(profile, f, indent=2)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0 if all(result["ok"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
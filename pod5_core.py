@@ -0,0 +1,2065 @@
+import io
+import os
+import re
+import sys
+import bisect
+import fnmatch
+import mmap
+import struct
+import zlib
+import json
+import hashlib
+import shutil
+import tarfile
+import tempfile
+import queue
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+
+# ==================================================
+# Funções de Processamento POD5
+# ==================================================
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+class OperationCancelled(Exception):
+    """Levantada quando uma operação é interrompida pelo cancel_event."""
+
+def _check_cancel(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise OperationCancelled("Operação cancelada")
+
+# Tamanho dos blocos usados nas cópias e leituras em streaming
+COPY_CHUNK = 1024 * 1024
+
+# Bytes comprimidos lidos do mmap por vez em EntryReader
+STREAM_CHUNK = 64 * 1024
+
+# Extração em pipeline: tamanho máximo de cada leitura sequencial, maior intervalo entre
+# dois trechos lidos na mesma leitura e limite padrão de bytes em trânsito entre os estágios
+READ_AHEAD = 4 * 1024 * 1024
+READ_GAP = 64 * 1024
+PIPELINE_MEMORY = 64 * 1024 * 1024
+
+class _Crc32:
+    """Interface de hasher (update/hexdigest) sobre zlib.crc32."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return "%08x" % self.value
+
+# Algoritmos aceitos no manifesto; blake2b e crc32 são opções mais baratas que o sha256
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "crc32": _Crc32,
+}
+
+def _new_hasher(algo):
+    try:
+        return HASH_ALGORITHMS[algo]()
+    except KeyError:
+        raise ValueError(f"Algoritmo de hash desconhecido: {algo}") from None
+
+def calculate_hash(data, algo="sha256"):
+    hasher = _new_hasher(algo)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+def calculate_file_hash(path, algo="sha256"):
+    """Calcula o hash de um arquivo lendo-o em blocos."""
+    hasher = _new_hasher(algo)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _write_all(out, data):
+    """Grava data inteiro em out, repetindo escritas parciais (arquivos sem buffer)."""
+    view = memoryview(data)
+    while view:
+        written = out.write(view)
+        if not written:
+            raise OSError("Falha na gravação: nenhum byte escrito")
+        view = view[written:]
+
+def _copy_range(src, dst, offset, count):
+    """Copia count bytes de src (a partir de offset) para a posição atual de dst.
+
+    Usa os.copy_file_range/os.sendfile quando disponíveis (cópia dentro do kernel)
+    e cai para cópia em blocos caso contrário. dst deve ser um arquivo sem buffer (ou com
+    o buffer já esvaziado).
+    """
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    if hasattr(os, "copy_file_range"):
+        try:
+            while count > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, count, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+        except OSError:
+            pass
+    if count > 0 and sys.platform.startswith("linux"):
+        try:
+            while count > 0:
+                copied = os.sendfile(dst_fd, src_fd, offset, count)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+        except OSError:
+            pass
+    if count > 0:
+        src.seek(offset)
+        while count > 0:
+            chunk = src.read(min(count, COPY_CHUNK))
+            if not chunk:
+                break
+            _write_all(dst, chunk)
+            count -= len(chunk)
+    if count > 0:
+        raise ValueError("Arquivo POD5 truncado")
+
+def _file_changed(item, path):
+    """Indica se o arquivo extraído difere do registrado no manifesto.
+
+    Se tamanho e mtime_ns coincidem com o manifesto o arquivo é considerado inalterado
+    sem ser lido; caso contrário o hash é recalculado. Retorna (modificado, stat).
+    """
+    st = os.stat(path)
+    if st.st_size == item.get('file_size') and st.st_mtime_ns == item.get('mtime_ns'):
+        return False, st
+    return calculate_file_hash(path, item.get('hash_algo', 'sha256')) != item['hash'], st
+
+# umask do processo, lida uma vez na importação (os.umask só pode ser lida alterando-a)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+@contextmanager
+def _atomic_output(path, mode_from=None):
+    """Abre um arquivo temporário (sem buffer) que substitui path atomicamente ao final.
+
+    O arquivo final recebe as permissões de mode_from ou, sem ele, as de um arquivo novo
+    (0666 menos a umask), e não as 0600 do mkstemp. Em caso de erro o temporário é
+    removido e path não é alterado.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w+b', buffering=0) as out:
+            yield out
+            os.fsync(out.fileno())
+        if mode_from is not None:
+            shutil.copymode(mode_from, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _map_workers(func, items, workers=1):
+    """Aplica func a cada item, em paralelo quando workers > 1, preservando a ordem.
+
+    No máximo 2 * workers tarefas ficam pendentes, o que limita a memória usada
+    pelos resultados ainda não consumidos.
+    """
+    if workers <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+class _Phase:
+    """Medição de uma fase em andamento (ver Metrics.phase); bytes pode ser ajustado dentro do bloco."""
+    __slots__ = ("metrics", "name", "bytes", "start")
+
+    def __init__(self, metrics, name, nbytes):
+        self.metrics = metrics
+        self.name = name
+        self.bytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.add(self.name, time.perf_counter() - self.start, self.bytes)
+
+class Metrics:
+    """Tempo e bytes acumulados por fase de uma operação.
+
+    Fases usadas: header, table, names, cache (leitura do POD), manifest, read, scan (conferência dos
+    arquivos extraídos), decompress, hash, compress e write. Fases executadas nas threads
+    somam o tempo de todas elas. callback(fase, segundos, bytes), se informado, é chamado
+    a cada medição (em qualquer thread).
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.phases = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def phase(self, name, nbytes=0):
+        """Context manager que mede o bloco como uma ocorrência da fase name."""
+        return _Phase(self, name, nbytes)
+
+    def add(self, name, seconds, nbytes=0):
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = {"seconds": 0.0, "bytes": 0, "calls": 0}
+            stats["seconds"] += seconds
+            stats["bytes"] += nbytes
+            stats["calls"] += 1
+        if self.callback:
+            self.callback(name, seconds, nbytes)
+
+    def as_dict(self):
+        """Resumo serializável em JSON: tempo total e {fase: seconds, bytes, calls, mb_per_s}."""
+        with self._lock:
+            phases = {}
+            for name, stats in self.phases.items():
+                seconds = stats["seconds"]
+                mb_per_s = stats["bytes"] / (1024 * 1024) / seconds if seconds and stats["bytes"] else None
+                phases[name] = dict(stats, seconds=round(seconds, 6),
+                                    mb_per_s=round(mb_per_s, 2) if mb_per_s else None)
+        return {"elapsed": round(time.perf_counter() - self._start, 6), "phases": phases}
+
+    def format_lines(self):
+        return format_metrics(self.as_dict())
+
+def format_metrics(summary):
+    """Uma linha legível por fase de um resumo de Metrics.as_dict(), para logs."""
+    lines = []
+    for name, stats in summary["phases"].items():
+        line = f"{name:<10} {stats['seconds']:9.3f}s  {stats['calls']:7d}x  {stats['bytes']:12d} bytes"
+        if stats["mb_per_s"]:
+            line += f"  {stats['mb_per_s']:.1f} MB/s"
+        lines.append(line)
+    return lines
+
+# ==================================================
+# Cache de índice (tabela de entradas e nomes já decodificados)
+# ==================================================
+
+def default_cache_dir():
+    """Pasta padrão do cache de índice: $POD5_CACHE_DIR ou a pasta de cache do usuário."""
+    if os.environ.get("POD5_CACHE_DIR"):
+        return os.environ["POD5_CACHE_DIR"]
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pod5_toolkit")
+
+class IndexCache:
+    """Cache em disco da tabela de entradas e dos nomes de cada POD, um arquivo .idx por POD.
+
+    Cada .idx é identificado pelo caminho absoluto do POD e só é usado se tamanho, mtime,
+    inode e os campos do cabeçalho (count, info_off, names_size) ainda conferem; um POD
+    alterado há menos de RACY_SECONDS não é guardado, pois uma nova alteração no mesmo
+    intervalo do relógio do sistema de arquivos poderia manter o mesmo mtime. Quando a pasta
+    passa de max_bytes, os .idx usados há mais tempo são removidos (LRU pelo mtime do .idx,
+    atualizado a cada acerto).
+    """
+
+    MAGIC = b'P5IX'
+    VERSION = 1
+    # magic, versão, file_size, mtime_ns, inode, count, info_off, names_size, entry_size, len(path), crc32
+    HEADER = struct.Struct('<4sIQQQIIIIII')
+    RACY_SECONDS = 2
+
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _cache_path(self, path):
+        key = hashlib.blake2b(os.path.abspath(path).encode('utf-8', 'surrogateescape'), digest_size=16)
+        return os.path.join(self.directory, key.hexdigest() + ".idx")
+
+    def _header_fields(self, archive, st):
+        return (st.st_size, st.st_mtime_ns, st.st_ino, archive.count, archive.info_off,
+                archive.names_size, archive.entry_size)
+
+    def load(self, archive, st):
+        """Retorna (name_offs, zsizes, offsets, sizes, names) do cache, ou None se ausente ou desatualizado."""
+        cache_path = self._cache_path(archive.path)
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            magic, version, *fields, path_len, crc = self.HEADER.unpack_from(data)
+        except struct.error:
+            return None
+        body = memoryview(data)[self.HEADER.size:]
+        if (magic != self.MAGIC or version != self.VERSION or tuple(fields) != self._header_fields(archive, st)
+                or zlib.crc32(body) != crc):
+            return None
+        if bytes(body[:path_len]).decode('utf-8', 'surrogateescape') != os.path.abspath(archive.path):
+            return None
+
+        pos = path_len
+        columns = []
+        for _ in range(4):
+            column = array(_U32)
+            column.frombytes(body[pos:pos + archive.count * 4])
+            if sys.byteorder != 'little':
+                column.byteswap()
+            columns.append(column)
+            pos += archive.count * 4
+        names = bytes(body[pos:]).decode('ascii').split('\x00') if archive.count else []
+        if len(names) != archive.count:
+            return None
+        try:
+            os.utime(cache_path)  # marca como usado recentemente
+        except OSError:
+            pass
+        return (*columns, names)
+
+    def store(self, archive, st):
+        """Grava o índice já decodificado de archive e aplica o limite de tamanho da pasta."""
+        if time.time() - st.st_mtime_ns / 1e9 < self.RACY_SECONDS:
+            return
+        path = os.path.abspath(archive.path).encode('utf-8', 'surrogateescape')
+        parts = [path]
+        for column in (archive._name_offs, archive._zsizes, archive._offsets, archive._sizes):
+            if sys.byteorder != 'little':
+                column = array(_U32, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        parts.append('\x00'.join(archive.names).encode('ascii'))
+        body = b''.join(parts)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, *self._header_fields(archive, st), len(path),
+                                  zlib.crc32(body))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(header)
+                    f.write(body)
+                os.replace(tmp_path, self._cache_path(archive.path))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            self.evict()
+        except OSError:
+            pass  # o cache é opcional: falhas de gravação são ignoradas
+
+    def evict(self):
+        """Remove os .idx menos usados até a pasta ficar dentro de max_bytes."""
+        files = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(".idx"):
+                    try:
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime_ns, st.st_size, item.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove todos os .idx da pasta do cache."""
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith(".idx"):
+                        os.remove(item.path)
+        except FileNotFoundError:
+            pass
+
+# Cache usado por PodArchive quando nenhum é informado (desativado até set_index_cache)
+_index_cache = None
+
+def set_index_cache(cache):
+    """Define o IndexCache padrão de PodArchive (None desativa)."""
+    global _index_cache
+    _index_cache = cache
+
+# Tipo de array para inteiros de 32 bits sem sinal
+_U32 = 'I' if array('I').itemsize == 4 else 'L'
+
+PodEntry = namedtuple("PodEntry", ["index", "name", "name_off", "zsize", "offset", "size"])
+
+class PodArchive:
+    """Leitor de arquivos POD5 mapeado em memória.
+
+    O cabeçalho, a tabela de entradas e o bloco de nomes são lidos uma única vez;
+    as entradas ficam em arrays compactos e são expostas como uma sequência de PodEntry.
+    """
+
+    def __init__(self, path, metrics=None, index_cache=None):
+        self.path = path
+        self._mm = None
+        self._file = open(path, 'rb')
+        try:
+            st = os.fstat(self._file.fileno())
+            self.file_size = st.st_size
+            if self.file_size < 0x114:
+                raise ValueError("Arquivo POD5 inválido")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse(metrics or Metrics(), index_cache or _index_cache, st)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, metrics, index_cache, st):
+        mm = self._mm
+        with metrics.phase("header", 0x114):
+            if mm[:4] != b'POD5':
+                raise ValueError("Arquivo POD5 inválido")
+
+            # Cabeçalho: número de entradas em 0x58; info_off, ZERO e names_size em 0x108
+            self.count = struct.unpack_from('<I', mm, 0x58)[0]
+            self.info_off, _, self.names_size = struct.unpack_from('<3I', mm, 0x108)
+            self.names_off = self.file_size - self.names_size
+            if not 0 < self.info_off <= self.names_off <= self.file_size:
+                raise ValueError("Arquivo POD5 inválido")
+            self.entry_size = (self.names_off - self.info_off) // self.count if self.count else 16
+            if self.entry_size < 16:
+                raise ValueError("Arquivo POD5 inválido")
+
+        cached = None
+        if index_cache is not None:
+            with metrics.phase("cache"):
+                cached = index_cache.load(self, st)
+        if cached is not None:
+            self._name_offs, self._zsizes, self._offsets, self._sizes, self.names = cached
+        else:
+            with metrics.phase("table", self.count * self.entry_size):
+                self._parse_table(mm)
+            with metrics.phase("names", self.names_size):
+                self._parse_names(mm)
+            if index_cache is not None:
+                index_cache.store(self, st)
+        self._name_map = None
+        self._name_index = None
+
+    def _parse_table(self, mm):
+        # Tabela de entradas decodificada em bloco
+        table = mm[self.info_off:self.info_off + self.count * self.entry_size]
+        if self.entry_size % 4 == 0:
+            values = array(_U32)
+            values.frombytes(table)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            stride = self.entry_size // 4
+            self._name_offs = values[0::stride]
+            self._zsizes = values[1::stride]
+            self._offsets = values[2::stride]
+            self._sizes = values[3::stride]
+        else:
+            fmt = '<4I%dx' % (self.entry_size - 16)
+            columns = tuple(zip(*struct.iter_unpack(fmt, table))) or ((), (), (), ())
+            self._name_offs, self._zsizes, self._offsets, self._sizes = (
+                array(_U32, column) for column in columns)
+
+    def _parse_names(self, mm):
+        # Bloco de nomes dividido em uma única passagem
+        block = mm[self.names_off:self.file_size]
+        by_offset = {}
+        pos = 0
+        for part in block.split(b'\x00'):
+            by_offset[pos] = part
+            pos += len(part) + 1
+        names = []
+        for name_off in self._name_offs:
+            raw = by_offset.get(name_off)
+            if raw is None:
+                # Nome que começa no meio de outro nome
+                raw = block[name_off:].split(b'\x00', 1)[0]
+            names.append(raw.decode('ascii'))
+        self.names = names
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return PodEntry(index, self.names[index], self._name_offs[index],
+                        self._zsizes[index], self._offsets[index], self._sizes[index])
+
+    def __iter__(self):
+        return map(PodEntry, range(self.count), self.names, self._name_offs,
+                   self._zsizes, self._offsets, self._sizes)
+
+    @property
+    def name_map(self):
+        """Dicionário nome -> índice (com nomes repetidos, vale a última entrada)."""
+        if self._name_map is None:
+            self._name_map = {name: i for i, name in enumerate(self.names)}
+        return self._name_map
+
+    @property
+    def name_index(self):
+        if self._name_index is None:
+            self._name_index = NameIndex(self.names)
+        return self._name_index
+
+    def find(self, name):
+        """Retorna a PodEntry com o nome exato informado (KeyError se não existir)."""
+        return self[self.name_map[name]]
+
+    def select(self, patterns):
+        """Retorna os índices (em ordem) das entradas que correspondem a algum dos padrões.
+
+        Cada padrão é um nome exato ou um glob (sem diferenciar maiúsculas de minúsculas);
+        sem patterns (None) todas as entradas são selecionadas.
+        """
+        if patterns is None:
+            return range(len(self))
+        selected = set()
+        for pattern in patterns:
+            if pattern in self.name_map:
+                selected.add(self.name_map[pattern])
+                continue
+            matches = self.name_index.search(pattern) if any(c in pattern for c in "*?[") else []
+            if not matches:
+                raise ValueError(f"Nenhuma entrada corresponde a '{pattern}'")
+            selected.update(matches)
+        return sorted(selected)
+
+    def read_range(self, offset, size):
+        return self._mm[offset:offset + size]
+
+    def pread(self, offset, size):
+        """Lê um trecho com os.pread, sem passar pelo mmap: a espera pelo disco não prende o GIL."""
+        if not hasattr(os, "pread"):
+            return self.read_range(offset, size)
+        data = os.pread(self._file.fileno(), size, offset)
+        if len(data) != size:
+            raise ValueError("Arquivo POD5 truncado")
+        return data
+
+    def copy_range(self, dst, offset, size):
+        """Copia um trecho do arquivo diretamente para dst (ver _copy_range)."""
+        _copy_range(self._file, dst, offset, size)
+
+    def read(self, entry):
+        """Retorna os dados (descomprimidos) de uma entrada."""
+        if entry.zsize == entry.size:
+            return self._mm[entry.offset:entry.offset + entry.size]
+        return zlib.decompress(self._mm[entry.offset:entry.offset + entry.zsize])
+
+    def open_entry(self, name_or_index):
+        """Abre uma entrada (pelo nome ou índice) para leitura em fluxo (ver EntryReader)."""
+        entry = self[name_or_index] if isinstance(name_or_index, int) else self.find(name_or_index)
+        return EntryReader(self._mm, entry)
+
+    def overlapping_entries(self):
+        """Retorna o conjunto de índices cujo trecho de dados se sobrepõe ao de outra entrada."""
+        offsets, zsizes = self._offsets, self._zsizes
+        shared = set()
+        max_end = -1
+        max_index = None
+        for i in sorted(range(self.count), key=lambda i: (offsets[i], zsizes[i])):
+            start = offsets[i]
+            end = start + zsizes[i]
+            if start < max_end:
+                shared.add(i)
+                shared.add(max_index)
+            if end > max_end:
+                max_end = end
+                max_index = i
+        return shared
+
+class EntryReader(io.RawIOBase):
+    """Leitura em fluxo de uma entrada, sem carregar o payload inteiro na memória.
+
+    Entradas comprimidas são descomprimidas aos poucos com zlib.decompressobj, lendo no
+    máximo STREAM_CHUNK bytes do mmap por vez e nunca produzindo mais do que o pedido.
+    seek para frente descarta dados; para trás, reinicia a descompressão do começo.
+    """
+
+    def __init__(self, mm, entry, on_close=None):
+        super().__init__()
+        self.entry = entry
+        self.name = entry.name
+        self._mm = mm
+        self._on_close = on_close
+        self._compressed = entry.zsize != entry.size
+        self._pos = 0
+        self._restart()
+
+    def _restart(self):
+        self._pos = 0
+        self._src = self.entry.offset
+        self._tail = b''
+        self._inflater = zlib.decompressobj() if self._compressed else None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def _inflate(self, n):
+        """Retorna até n bytes descomprimidos a partir da posição atual."""
+        inflater = self._inflater
+        end = self.entry.offset + self.entry.zsize
+        while True:
+            if self._tail:
+                data = inflater.decompress(self._tail, n)
+            elif self._src < end:
+                chunk = self._mm[self._src:min(self._src + STREAM_CHUNK, end)]
+                self._src += len(chunk)
+                data = inflater.decompress(chunk, n)
+            else:
+                data = inflater.decompress(b'', n)  # saída ainda pendente no descompressor
+            self._tail = inflater.unconsumed_tail
+            if data:
+                return data
+            if inflater.eof or (self._src >= end and not self._tail):
+                raise ValueError(f"Dados comprimidos de '{self.name}' terminam antes do esperado")
+
+    def readinto(self, buffer):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        n = min(len(buffer), self.entry.size - self._pos)
+        if n <= 0:
+            return 0
+        if self._compressed:
+            data = self._inflate(n)
+        else:
+            start = self.entry.offset + self._pos
+            data = self._mm[start:start + n]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.entry.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"whence inválido: {whence}")
+        if offset < 0:
+            raise ValueError(f"Posição negativa: {offset}")
+        offset = min(offset, self.entry.size)
+        if not self._compressed:
+            self._pos = offset
+            return offset
+        if offset < self._pos:
+            self._restart()
+        skip = bytearray(min(STREAM_CHUNK, max(offset - self._pos, 0)))
+        while self._pos < offset:
+            self.readinto(memoryview(skip)[:offset - self._pos])
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._inflater = None
+            super().close()
+            if self._on_close is not None:
+                self._on_close()
+
+def _pack_data(data, compress_level):
+    """Prepara os dados de uma entrada modificada para gravação no POD.
+
+    Com compress_level > 0 os dados são comprimidos com zlib; se a compressão não reduzir
+    o tamanho, a entrada é gravada sem compressão (zsize == size). Retorna (payload, size).
+    """
+    if compress_level:
+        packed = zlib.compress(data, compress_level)
+        if len(packed) < len(data):
+            return packed, len(data)
+    return data, len(data)
+
+class _FileSlice:
+    """Trecho de um arquivo aberto usado como payload (copiado sem passar pela memória)."""
+    __slots__ = ("file", "offset", "size")
+
+    def __init__(self, file, offset, size):
+        self.file = file
+        self.offset = offset
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+def _payload_key(payload, size):
+    """Chave de conteúdo de um payload: payloads com a mesma chave são idênticos."""
+    return hashlib.blake2b(payload).hexdigest(), len(payload), size
+
+def _write_payload(out, payload):
+    """Grava um payload (bytes ou _FileSlice) na posição atual de out."""
+    if isinstance(payload, _FileSlice):
+        _copy_range(payload.file, out, payload.offset, payload.size)
+    else:
+        _write_all(out, payload)
+
+def _set_entry(table, entry_size, index, zsize, offset, size):
+    struct.pack_into('<3I', table, index * entry_size + 4, zsize, offset, size)
+
+def _write_table(out, table):
+    """Grava a tabela de entradas na posição atual de out e aponta info_off (0x108) para ela."""
+    info_off = out.tell()
+    _write_all(out, table)
+    end = out.tell()
+    out.seek(0x108)
+    _write_all(out, struct.pack('<I', info_off))
+    out.seek(end)
+    return info_off
+
+def _rebuild_archive(archive, out, updates, metrics=None):
+    """Grava em out o POD de archive com os payloads de updates anexados após os dados originais.
+
+    updates é um iterável de (index, payload, size, key); payloads com a mesma key (ver
+    _payload_key) são gravados uma única vez e compartilham o offset. Retorna
+    ({index: (zsize, offset, size)}, bytes economizados pela deduplicação).
+    O tempo de gravação é registrado na fase write de metrics.
+    """
+    metrics = metrics or Metrics()
+
+    # Tabela de entradas original (a única parte mantida em memória)
+    table = bytearray(archive.read_range(archive.info_off, archive.names_off - archive.info_off))
+
+    # Parte 1: Dados originais (até o início da tabela)
+    with metrics.phase("write", archive.info_off):
+        archive.copy_range(out, 0, archive.info_off)
+
+    # Parte 2: Dados das entradas modificadas, gravados conforme ficam prontos
+    placed = {}
+    by_key = {}
+    saved = 0
+    for index, payload, size, key in updates:
+        if key is not None and key in by_key:
+            zsize, offset = by_key[key]
+            saved += zsize
+        else:
+            with metrics.phase("write") as phase:
+                offset = out.tell()
+                _write_payload(out, payload)
+                zsize = phase.bytes = out.tell() - offset
+            if key is not None:
+                by_key[key] = (zsize, offset)
+        _set_entry(table, archive.entry_size, index, zsize, offset, size)
+        placed[index] = (zsize, offset, size)
+
+    with metrics.phase("write", len(table) + archive.names_size):
+        # Parte 3: Tabela de entradas atualizada
+        _write_table(out, table)
+
+        # Parte 4: Seção de nomes (inalterada)
+        archive.copy_range(out, archive.names_off, archive.names_size)
+    return placed, saved
+
+def _patch_in_place(path, updates, metrics=None):
+    """Aplica updates [(index, payload, size, key)] diretamente no arquivo POD em path.
+
+    Um payload que cabe no zsize original (e cujo trecho não é compartilhado com outra
+    entrada) é regravado no mesmo lugar; se todos couberem, só a tabela é regravada, no
+    lugar dela. Os demais são anexados depois do fim do arquivo, seguidos da nova tabela e
+    da seção de nomes, e então o info_off (0x108) passa a apontar para a nova tabela.
+    Payloads com a mesma key são gravados uma única vez.
+    Se uma gravação falhar, os trechos regravados são restaurados e o que foi anexado é
+    descartado. Já uma interrupção do processo (kill, queda de energia) no meio da gravação
+    deixa o POD inválido: nesse caso só o modo padrão (*_new.pod) é seguro.
+    Retorna ({index: (zsize, offset, size)}, bytes economizados).
+    """
+    metrics = metrics or Metrics()
+    with PodArchive(path, metrics) as archive:
+        file_size = archive.file_size
+        info_off = archive.info_off
+        entry_size = archive.entry_size
+        original_table = archive.read_range(info_off, archive.names_off - info_off)
+        names = archive.read_range(archive.names_off, archive.names_size)
+        offsets, zsizes = archive._offsets, archive._zsizes
+        shared = archive.overlapping_entries()
+
+    # Define o lugar de cada payload antes de gravar qualquer coisa
+    table = bytearray(original_table)
+    placed = {}
+    by_key = {}
+    saved = 0
+    in_slot = []   # (offset, payload) regravados no lugar original
+    appended = []  # payloads anexados depois do fim do arquivo, em ordem
+    append_off = file_size
+    for index, payload, size, key in updates:
+        zsize = len(payload)
+        if key is not None and key in by_key:
+            offset = by_key[key]
+            saved += zsize
+        else:
+            if index not in shared and zsize <= zsizes[index]:
+                offset = offsets[index]
+                in_slot.append((offset, payload))
+            else:
+                offset = append_off
+                append_off += zsize
+                appended.append(payload)
+            if key is not None:
+                by_key[key] = offset
+        _set_entry(table, entry_size, index, zsize, offset, size)
+        placed[index] = (zsize, offset, size)
+
+    # O mmap é fechado antes de escrever (no Windows um arquivo mapeado não pode crescer)
+    undo = []  # (offset, bytes originais) de cada trecho regravado
+    with open(path, 'r+b', buffering=0) as out:
+        try:
+            if appended:
+                with metrics.phase("write", append_off - file_size + len(table) + len(names)):
+                    out.seek(file_size)
+                    for payload in appended:
+                        _write_payload(out, payload)
+                    new_info_off = out.tell()
+                    _write_all(out, table)
+                    _write_all(out, names)
+                    os.fsync(out.fileno())
+
+            for offset, payload in in_slot:
+                with metrics.phase("write", len(payload)):
+                    out.seek(offset)
+                    undo.append((offset, out.read(len(payload))))
+                    out.seek(offset)
+                    _write_payload(out, payload)
+
+            with metrics.phase("write", 4 if appended else len(table)):
+                if appended:
+                    undo.append((0x108, struct.pack('<I', info_off)))
+                    out.seek(0x108)
+                    _write_all(out, struct.pack('<I', new_info_off))
+                else:
+                    undo.append((info_off, original_table))
+                    out.seek(info_off)
+                    _write_all(out, table)
+                os.fsync(out.fileno())
+        except BaseException:
+            for offset, data in reversed(undo):
+                out.seek(offset)
+                _write_all(out, data)
+            out.truncate(file_size)
+            raise
+    return placed, saved
+
+def _with_progress(items, total, progress_callback, cancel_event=None):
+    """Repassa items, chamando progress_callback depois que cada item é consumido.
+
+    Antes de cada item verifica cancel_event e levanta OperationCancelled se ele estiver ativo.
+    """
+    for idx, item in enumerate(items):
+        _check_cancel(cancel_event)
+        yield item
+        if progress_callback:
+            progress = (idx + 1) / total * 100
+            progress_callback(progress, "")
+
+def save_manifest(manifest_path, manifest):
+    with _atomic_output(manifest_path) as mf:
+        _write_all(mf, json.dumps(manifest, indent=2).encode())
+
+def _write_file(path, data):
+    """Grava data em path via <path>.part, para nunca deixar um arquivo pela metade."""
+    tmp_path = path + ".part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _make_dirs(path, created):
+    """os.makedirs que acrescenta a created as pastas que não existiam (das externas para as internas)."""
+    missing = []
+    while path and not os.path.isdir(path):
+        missing.append(path)
+        path = os.path.dirname(path)
+    if missing:
+        os.makedirs(missing[0], exist_ok=True)
+        created.extend(reversed(missing))
+
+def _load_manifest(manifest_path):
+    """Lê um manifesto existente, retornando {} se ele não existir ou for inválido."""
+    try:
+        with open(manifest_path, 'r') as mf:
+            return {item['index']: item for item in json.load(mf)}
+    except (OSError, ValueError, TypeError, KeyError):
+        return {}
+
+def _manifest_item(entry, data_hash=None, hash_algo=None):
+    """Registro do manifesto de uma entrada (data_hash None: entrada não extraída)."""
+    item = {
+        "index": entry.index,
+        "name": entry.name,
+        "original_zsize": entry.zsize,
+        "original_size": entry.size,
+        "original_offset": entry.offset,
+        "hash": data_hash,
+    }
+    if hash_algo is not None:
+        item["hash_algo"] = hash_algo
+    item["compressed"] = (entry.zsize != entry.size)
+    return item
+
+def _same_entry(item, entry):
+    return (item is not None and item.get('name') == entry.name and item.get('original_offset') == entry.offset
+            and item.get('original_zsize') == entry.zsize and item.get('original_size') == entry.size)
+
+class _ByteBudget:
+    """Limita os bytes em trânsito no pipeline: acquire bloqueia até release liberar espaço.
+
+    Um item maior que o limite passa quando o pipeline está vazio, para nunca travar.
+    """
+
+    def __init__(self, limit, stop):
+        self._limit = limit
+        self._used = 0
+        self._stop = stop
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        with self._cond:
+            while self._used and self._used + n > self._limit:
+                if self._stop.is_set():
+                    return False
+                self._cond.wait(0.1)
+            self._used += n
+            return True
+
+    def release(self, n):
+        with self._cond:
+            self._used -= n
+            self._cond.notify_all()
+
+def _extract_pipeline(archive, entries, hash_algo, workers=1, memory_limit=PIPELINE_MEMORY, metrics=None):
+    """Lê, descomprime e calcula o hash das entries em estágios ligados por filas limitadas.
+
+    O estágio de leitura percorre os trechos em ordem de offset, juntando trechos próximos
+    em leituras sequenciais de até READ_AHEAD bytes (cada leitura segue como um lote);
+    workers threads descomprimem e calculam o hash de cada lote; o consumidor do gerador é
+    o estágio de gravação. Entradas que apontam para o
+    mesmo trecho são lidas e descomprimidas uma única vez. Os bytes em trânsito (comprimidos
+    + descomprimidos) ficam limitados a memory_limit. Gera (entradas, dados, hash) na ordem
+    em que ficam prontos; fechar o gerador encerra as threads.
+    """
+    metrics = metrics or Metrics()
+    workers = max(1, workers)
+    groups = {}
+    for entry in entries:
+        groups.setdefault((entry.offset, entry.zsize), []).append(entry)
+    ranges = sorted(groups)
+
+    stop = threading.Event()
+    errors = []
+    budget = _ByteBudget(memory_limit, stop)
+    raw_queue = queue.Queue(maxsize=workers * 2)
+    ready_queue = queue.Queue(maxsize=workers * 2)
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if errors:
+                    raise errors[0]
+                if stop.is_set():
+                    return None
+
+    def reader():
+        try:
+            i = 0
+            while i < len(ranges):
+                start, zsize = ranges[i]
+                end = start + zsize
+                j = i + 1
+                while j < len(ranges):
+                    offset, zsize = ranges[j]
+                    if offset > end + READ_GAP or max(end, offset + zsize) - start > READ_AHEAD:
+                        break
+                    end = max(end, offset + zsize)
+                    j += 1
+                batch = ranges[i:j]
+                i = j
+                cost = sum(zsize + groups[(offset, zsize)][0].size for offset, zsize in batch)
+                if not budget.acquire(cost):
+                    return
+                with metrics.phase("read", end - start):
+                    chunk = archive.pread(start, end - start)
+                view = memoryview(chunk)
+                items = [(groups[(offset, zsize)], view[offset - start:offset - start + zsize])
+                         for offset, zsize in batch]
+                del chunk, view
+                if not put(raw_queue, (items, cost)):
+                    return
+            for _ in range(workers):
+                put(raw_queue, None)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def worker():
+        try:
+            while True:
+                item = get(raw_queue)
+                if item is None:
+                    break
+                items, cost = item
+                ready = []
+                for group, raw in items:
+                    entry = group[0]
+                    if entry.zsize != entry.size:
+                        with metrics.phase("decompress", entry.size):
+                            raw = zlib.decompress(raw)
+                    with metrics.phase("hash", entry.size):
+                        ready.append((group, raw, calculate_hash(raw, hash_algo)))
+                del items
+                if not put(ready_queue, (ready, cost)):
+                    break
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(ready_queue, None)
+
+    threads = [threading.Thread(target=reader, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        finished = 0
+        while finished < workers:
+            item = get(ready_queue)
+            if item is None:
+                finished += 1
+                continue
+            ready, cost = item
+            yield from ready
+            del ready
+            budget.release(cost)
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def _last_index(archive):
+    """Nome -> índice da última entrada com esse nome: com nomes repetidos só ela é gravada."""
+    return {name: i for i, name in enumerate(archive.names)}
+
+def _extract_entries(archive, entries, write_member, hash_algo, workers, memory_limit, metrics,
+                     progress_callback=None, cancel_event=None, done=()):
+    """Extrai entries pelo pipeline (ver _extract_pipeline) e monta os registros do manifesto.
+
+    A leitura segue a ordem dos offsets no arquivo e memory_limit limita os bytes em
+    trânsito entre leitura, descompressão e gravação. Entradas que apontam para o mesmo
+    trecho de dados são descomprimidas uma única vez.
+
+    write_member(entry, data) grava um arquivo e retorna campos extras do registro (stat,
+    CRC32...); é chamado na thread atual e só para a última entrada de cada nome. done são
+    registros já prontos (extração incremental), que contam no progresso. Retorna
+    ({index: (registro, extraído)}, dedup_saved), onde dedup_saved são os bytes de
+    descompressão evitados por entradas que compartilham o mesmo trecho.
+    """
+    last_index = _last_index(archive)
+    range_sizes = {(entry.offset, entry.zsize): entry.size for entry in entries}
+    dedup_saved = sum(entry.size for entry in entries) - sum(range_sizes.values())
+    pipeline = _extract_pipeline(archive, entries, hash_algo, workers, memory_limit, metrics)
+
+    def results():
+        for item in done:
+            yield item, False
+        for group, data, data_hash in pipeline:
+            for entry in group:
+                item = _manifest_item(entry, data_hash, hash_algo)
+                if last_index[entry.name] == entry.index:
+                    with metrics.phase("write", len(data)):
+                        item.update(write_member(entry, data))
+                yield item, True
+
+    try:
+        processed = {item["index"]: (item, extracted) for item, extracted in
+                     _with_progress(results(), len(entries) + len(done), progress_callback, cancel_event)}
+    except BaseException:
+        pipeline.close()  # encerra as threads antes de propagar o erro
+        raise
+    return processed, dedup_saved
+
+def extract_entry(input_file, name):
+    """Retorna os dados (descomprimidos) da entrada com o nome informado."""
+    with PodArchive(input_file) as archive:
+        return archive.read(archive.find(name))
+
+def open_entry(input_file, name_or_index):
+    """Abre uma entrada de input_file para leitura em fluxo.
+
+    Retorna um EntryReader (io.RawIOBase) que mantém o arquivo aberto até ser fechado;
+    use io.BufferedReader sobre ele para leituras por linha. Ex.:
+
+        with open_entry("data.pod", "lang/english.lng") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                ...
+    """
+    archive = PodArchive(input_file)
+    try:
+        entry = archive[name_or_index] if isinstance(name_or_index, int) else archive.find(name_or_index)
+    except BaseException:
+        archive.close()
+        raise
+    return EntryReader(archive._mm, entry, on_close=archive.close)
+
+def extract_pod5(input_file, output_dir, lang="pt", workers=1, hash_algo="sha256",
+                 progress_callback=None, cancel_event=None, patterns=None, incremental=False, metrics=None,
+                 memory_limit=PIPELINE_MEMORY):
+    """Extrai as entradas para output_dir e grava o _manifest.json.
+
+    patterns (nomes ou globs) limita as entradas extraídas, mas o manifesto descreve a
+    tabela inteira. Com incremental=True as entradas cuja linha da tabela e cujo arquivo
+    conferem com o manifesto existente não são regravadas. Se a operação falhar ou for
+    cancelada, o que ela criou é removido. Retorna um resumo com as entradas e os bytes
+    processados, gravados e ignorados (ver _extract_entries).
+    """
+    _new_hasher(hash_algo)  # valida o algoritmo antes de extrair
+    manifest_path = os.path.join(output_dir, "_manifest.json")
+    metrics = metrics or Metrics()
+
+    with PodArchive(input_file, metrics) as archive:
+        selected = archive.select(patterns)
+        with metrics.phase("manifest"):
+            previous = _load_manifest(manifest_path) if patterns is not None or incremental else {}
+        last_index = _last_index(archive)
+
+        def up_to_date(entry):
+            """Registro do manifesto anterior, se a entrada não precisa ser extraída de novo."""
+            item = previous.get(entry.index)
+            if not _same_entry(item, entry) or not item.get('hash'):
+                return None
+            if last_index[entry.name] != entry.index:
+                return item  # entrada sobreposta por outra com o mesmo nome: nada a gravar
+            try:
+                with metrics.phase("scan"):
+                    changed, st = _file_changed(item, os.path.join(output_dir, entry.name))
+            except OSError:
+                return None
+            if changed:
+                return None
+            return dict(item, file_size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+        # Mantém o nome original para compatibilidade com o manifesto.
+        # Se necessário, outras adaptações podem ser feitas somente na interface.
+        def store(entry, data):
+            # Tamanho e mtime do arquivo extraído permitem ao import pular o hash
+            output_path = os.path.join(output_dir, entry.name)
+            _make_dirs(os.path.dirname(output_path), created_dirs)
+            if not os.path.exists(output_path):
+                created.append(output_path)
+            _write_file(output_path, data)
+            st = os.stat(output_path)
+            return {"file_size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+        # Entradas já atualizadas (extração incremental) são conferidas em paralelo antes do pipeline
+        entries = [archive[i] for i in selected]
+        current = {}
+        if incremental:
+            for entry, item in zip(entries, _map_workers(up_to_date, entries, workers)):
+                if item is not None:
+                    current[entry.index] = item
+            entries = [entry for entry in entries if entry.index not in current]
+
+        # O manifesto mantém a ordem da tabela, independente da ordem de conclusão
+        created = []
+        created_dirs = []
+        try:
+            done, dedup_saved = _extract_entries(archive, entries, store, hash_algo, workers, memory_limit,
+                                                 metrics, progress_callback, cancel_event, current.values())
+        except BaseException:
+            for path in created:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            # Pastas criadas por esta extração, das mais internas para as externas (só se vazias)
+            for path in reversed(created_dirs):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+            raise
+        processed = [done[i] for i in selected]
+
+        if patterns is None:
+            manifest = [item for item, written in processed]
+        else:
+            by_index = {item["index"]: item for item, written in processed}
+            manifest = []
+            for entry in archive:
+                item = by_index.get(entry.index)
+                if item is None:
+                    item = previous.get(entry.index)
+                    if not _same_entry(item, entry):
+                        item = _manifest_item(entry)
+                manifest.append(item)
+
+    # Salvar manifesto
+    with metrics.phase("manifest"):
+        save_manifest(manifest_path, manifest)
+    written = [item["original_size"] for item, was_written in processed if was_written]
+    skipped = [item["original_size"] for item, was_written in processed if not was_written]
+    return {"entries": len(processed), "written": len(written), "bytes": sum(written),
+            "skipped": len(skipped), "skipped_bytes": sum(skipped), "dedup_saved": dedup_saved}
+
+def import_pod5(original_file, extracted_dir, manifest_path, progress_callback=None,
+                workers=1, compress_level=6, in_place=False, cancel_event=None, metrics=None):
+    """Reimporta os arquivos modificados de extracted_dir (uma pasta ou um pacote .zip/.tar).
+
+    Por padrão gera <original>_new.pod; com in_place=True altera o próprio original_file
+    (ver _patch_in_place) e atualiza o manifesto. Um erro ou cancelamento não deixa saída
+    pela metade. Retorna False se nada mudou; caso contrário, um resumo com o número de
+    entradas modificadas e os bytes economizados pela deduplicação (dedup_saved).
+    """
+    metrics = metrics or Metrics()
+    if os.path.isfile(extracted_dir):
+        return _import_bundle(original_file, extracted_dir, progress_callback, workers, compress_level,
+                              in_place, cancel_event, metrics)
+
+    # Carrega o manifesto
+    with metrics.phase("manifest"):
+        with open(manifest_path, 'r') as mf:
+            manifest = json.load(mf)
+
+    # Determinar quais entradas foram modificadas (só arquivos com stat alterado são lidos)
+    source = _FolderSource(extracted_dir)
+    modified, stats = _scan_modified(source, manifest, workers, cancel_event, metrics)
+    changed = {item['index'] for item in modified}
+    touched = False
+    for item in manifest:
+        st = stats.get(item['index'])
+        if (st is not None and item['index'] not in changed
+                and (item.get('file_size'), item.get('mtime_ns')) != (st.st_size, st.st_mtime_ns)):
+            # Arquivo tocado mas com o mesmo conteúdo: atualiza o stat para não refazer o hash
+            item['file_size'] = st.st_size
+            item['mtime_ns'] = st.st_mtime_ns
+            touched = True
+
+    if touched:
+        with metrics.phase("manifest"):
+            save_manifest(manifest_path, manifest)
+
+    if not modified:
+        return False
+    snapshots = {} if in_place else None
+    updates = _prepare_updates(source, modified, compress_level, workers, progress_callback, cancel_event, metrics,
+                               snapshots)
+
+    if in_place:
+        # Todos os payloads são preparados antes de tocar no arquivo, para que um erro
+        # de leitura ou compressão (ou um cancelamento) não deixe o POD pela metade
+        placed, saved = _patch_in_place(original_file, list(updates), metrics)
+
+        # O manifesto passa a descrever o POD alterado, com o hash dos dados que foram gravados:
+        # um arquivo salvo de novo durante o import continua diferente do manifesto
+        for item in modified:
+            item['original_zsize'], item['original_offset'], item['original_size'] = placed[item['index']]
+            item['hash'], st = snapshots[item['index']]
+            item['file_size'] = st.st_size
+            item['mtime_ns'] = st.st_mtime_ns
+        with metrics.phase("manifest"):
+            save_manifest(manifest_path, manifest)
+        return {"modified": len(modified), "dedup_saved": saved}
+
+    return {"modified": len(modified), "dedup_saved": _write_new_pod(original_file, updates, metrics)}
+
+def _scan_modified(source, manifest, workers, cancel_event, metrics):
+    """Confere cada registro do manifesto em source (_FolderSource ou pacote) nas threads.
+
+    Retorna (registros modificados na ordem da tabela, {index: stat} dos arquivos de uma pasta).
+    """
+    def check(item):
+        with metrics.phase("scan"):
+            return source.check(item)
+
+    modified = []
+    stats = {}
+    checks = _with_progress(_map_workers(check, manifest, workers), len(manifest), None, cancel_event)
+    for item, (changed, st) in zip(manifest, checks):
+        if changed:
+            modified.append(item)
+        if st is not None:
+            stats[item['index']] = st
+    modified.sort(key=lambda item: item['index'])
+    return modified, stats
+
+def _prepare_updates(source, items, compress_level, workers, progress_callback, cancel_event, metrics,
+                     snapshots=None):
+    """Gera os updates de items lidos de source, na ordem de items conforme ficam prontos.
+
+    Cada arquivo é lido uma única vez e o update leva esses bytes, mesmo que o arquivo
+    mude antes da gravação. Entradas originalmente comprimidas são recomprimidas nas
+    threads com compress_level. Updates com conteúdo idêntico recebem a mesma key e
+    compartilham um único bloco de dados. Com snapshots, grava nele {index: (hash, stat)}
+    dos dados lidos (stat é None em pacotes).
+    """
+    def prepare(item):
+        level = compress_level if item.get('compressed') else 0
+        data, st = source.load(item)
+        if snapshots is not None:
+            with metrics.phase("hash", len(data)):
+                snapshots[item['index']] = (calculate_hash(data, item.get('hash_algo', 'sha256')), st)
+        with metrics.phase("compress", len(data)):
+            payload, size = _pack_data(data, level)
+        return _keyed_update(item['index'], payload, size, metrics)
+
+    return _with_progress(_map_workers(prepare, items, workers), len(items), progress_callback, cancel_event)
+
+def _keyed_update(index, payload, size, metrics):
+    """Monta o update (index, payload, size, key) usado por _rebuild_archive/_patch_in_place."""
+    with metrics.phase("hash", len(payload)):
+        return index, payload, size, _payload_key(payload, size)
+
+def _write_new_pod(original_file, updates, metrics):
+    """Grava <original>_new.pod com os updates e retorna os bytes economizados pela deduplicação."""
+    base_name = os.path.splitext(original_file)[0]
+    new_file = f"{base_name}_new.pod"
+    with PodArchive(original_file, metrics) as archive:
+        with _atomic_output(new_file, mode_from=original_file) as out:
+            placed, saved = _rebuild_archive(archive, out, updates, metrics)
+    return saved
+
+# ==================================================
+# Modo watch: reimportação contínua enquanto a pasta extraída é editada
+# ==================================================
+
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.3
+
+class PodWatcher:
+    """Mantém output_file (padrão: <original>_new.pod) sincronizado com extracted_dir.
+
+    start() faz uma importação completa; depois poll() encontra, só pelo stat, os arquivos
+    alterados e build() grava apenas essas entradas. O POD publicado nunca é alterado: as
+    entradas são gravadas in-place em uma cópia sombra (<output>.shadow), que então substitui
+    output_file com os.replace. O POD anterior vira a nova sombra (por um hard link) e
+    recebe no build seguinte as entradas que lhe faltam.
+    Entradas que passam a não caber no lugar original são anexadas (ver _patch_in_place),
+    então a saída pode crescer; um import normal gera a versão compacta.
+    """
+
+    def __init__(self, original_file, extracted_dir, manifest_path, output_file=None, workers=1,
+                 compress_level=6, metrics=None):
+        if os.path.isfile(extracted_dir):
+            raise ValueError("O modo watch precisa de uma pasta extraída (não de um pacote .zip/.tar)")
+        self.original_file = original_file
+        self.extracted_dir = extracted_dir
+        self.manifest_path = manifest_path
+        self._source = _FolderSource(extracted_dir)
+        self.output_file = output_file or f"{os.path.splitext(original_file)[0]}_new.pod"
+        self.shadow_file = self.output_file + ".shadow"
+        self.workers = workers
+        self.compress_level = compress_level
+        self.metrics = metrics or Metrics()
+        self.builds = 0
+        self._items = {}
+        self._paths = {}
+        self._seen = {}              # index -> (size, mtime_ns) do arquivo no último build
+        self._shadow_missing = set()  # entradas já publicadas que a sombra ainda não tem
+
+    def start(self, progress_callback=None, cancel_event=None):
+        """Importação completa inicial; grava output_file e a sombra. Retorna as entradas modificadas."""
+        with self.metrics.phase("manifest"):
+            with open(self.manifest_path, 'r') as mf:
+                manifest = json.load(mf)
+        self._items = {item['index']: item for item in manifest}
+        self._paths = {item['index']: self._source.path(item) for item in manifest}
+
+        modified, stats = _scan_modified(self._source, manifest, self.workers, cancel_event, self.metrics)
+        self._seen = {index: (st.st_size, st.st_mtime_ns) for index, st in stats.items()}
+        updates = self._updates(modified, progress_callback, cancel_event)
+        with PodArchive(self.original_file, self.metrics) as archive:
+            with _atomic_output(self.output_file, mode_from=self.original_file) as out:
+                _rebuild_archive(archive, out, updates, self.metrics)
+        with self.metrics.phase("write", os.path.getsize(self.output_file)):
+            shutil.copy(self.output_file, self.shadow_file)
+        self._shadow_missing = set()
+        return len(modified)
+
+    def _updates(self, items, progress_callback=None, cancel_event=None):
+        return _prepare_updates(self._source, items, self.compress_level, self.workers, progress_callback,
+                                cancel_event, self.metrics)
+
+    def poll(self):
+        """Retorna {index: (size, mtime_ns)} das entradas cujo arquivo mudou desde o último build.
+
+        Arquivos removidos (ou não extraídos) são ignorados: a entrada fica como está.
+        """
+        changed = {}
+        with self.metrics.phase("scan"):
+            for index, path in self._paths.items():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                current = (st.st_size, st.st_mtime_ns)
+                if self._seen.get(index) != current:
+                    changed[index] = current
+        return changed
+
+    def build(self, changed):
+        """Grava as entradas de changed (ver poll) na sombra e a publica como output_file."""
+        items = [self._items[index] for index in sorted(set(changed) | self._shadow_missing)]
+        # Os payloads são lidos antes de tocar na sombra: um erro de leitura não a altera
+        updates = list(self._updates(items))
+        try:
+            _patch_in_place(self.shadow_file, updates, self.metrics)
+        except BaseException:
+            # Sombra possivelmente pela metade: volta a ser uma cópia do POD publicado
+            shutil.copy(self.output_file, self.shadow_file)
+            self._shadow_missing = set()
+            raise
+        self._seen.update(changed)
+        self._shadow_missing = set(changed) if self._publish() else set()
+        self.builds += 1
+        return len(changed)
+
+    def _publish(self):
+        """Troca a sombra pelo POD publicado; retorna False se a nova sombra teve de ser copiada."""
+        spare = self.shadow_file + ".prev"
+        if os.path.exists(spare):
+            os.remove(spare)
+        try:
+            os.link(self.output_file, spare)
+        except OSError:
+            spare = None
+        os.replace(self.shadow_file, self.output_file)
+        if spare is None:
+            # Sistema de arquivos sem hard links: a nova sombra é uma cópia completa
+            with self.metrics.phase("write", os.path.getsize(self.output_file)):
+                shutil.copy(self.output_file, self.shadow_file)
+            return False
+        os.replace(spare, self.shadow_file)
+        return True
+
+    def run(self, on_build=None, cancel_event=None, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+        """Verifica a pasta a cada interval segundos até cancel_event ser ativado.
+
+        Rajadas de gravações são agrupadas: o build só acontece depois de debounce segundos
+        sem novas alterações. on_build recebe o resumo de cada build ({"modified", "seconds",
+        "output"} ou, em caso de erro, {"error"}); um erro não interrompe o watch, e as mesmas
+        alterações só são tentadas de novo quando os arquivos mudarem outra vez.
+        """
+        cancel_event = cancel_event or threading.Event()
+        pending = {}
+        failed = None
+        last_change = time.monotonic()
+        while not cancel_event.wait(interval):
+            changed = self.poll()
+            if changed != pending:
+                pending = changed
+                last_change = time.monotonic()
+            if not pending or pending == failed or time.monotonic() - last_change < debounce:
+                continue
+            start = time.perf_counter()
+            try:
+                result = {"modified": self.build(pending), "output": self.output_file}
+                pending = {}
+            except Exception as e:
+                result = {"error": str(e)}
+                failed = pending
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            if on_build:
+                on_build(result)
+
+    def close(self):
+        """Remove a sombra (o POD publicado permanece)."""
+        for path in (self.shadow_file, self.shadow_file + ".prev"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def watch_pod5(original_file, extracted_dir, manifest_path, output_file=None, workers=1, compress_level=6,
+               on_build=None, progress_callback=None, cancel_event=None, interval=WATCH_INTERVAL,
+               debounce=WATCH_DEBOUNCE, metrics=None):
+    """Importa extracted_dir e continua atualizando a saída a cada alteração (ver PodWatcher).
+
+    Roda até cancel_event ser ativado. on_build recebe também o resumo da importação
+    inicial (com "initial": True). Retorna o número de builds e o caminho da saída.
+    """
+    watcher = PodWatcher(original_file, extracted_dir, manifest_path, output_file, workers,
+                         compress_level, metrics)
+    try:
+        start = time.perf_counter()
+        modified = watcher.start(progress_callback, cancel_event)
+        if on_build:
+            on_build({"modified": modified, "output": watcher.output_file, "initial": True,
+                      "seconds": round(time.perf_counter() - start, 3)})
+        watcher.run(on_build, cancel_event, interval, debounce)
+    finally:
+        watcher.close()
+    return {"builds": watcher.builds, "output": watcher.output_file}
+
+# ==================================================
+# Pacotes .zip/.tar (um único arquivo em vez de uma pasta com milhares de arquivos)
+# ==================================================
+
+MANIFEST_NAME = "_manifest.json"
+BUNDLE_FORMATS = ("zip", "tar")
+
+def _bundle_format(path):
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    if fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Formato de pacote não suportado: '{path}' (use .zip ou .tar)")
+    return fmt
+
+class _BundleWriter:
+    """Grava membros sem compressão em um .zip ou .tar aberto em out."""
+
+    def __init__(self, out, fmt, mtime):
+        self._out = io.BufferedWriter(out, COPY_CHUNK)
+        self._mtime = int(mtime)
+        self._zip = self._tar = None
+        if fmt == "zip":
+            self._zip = zipfile.ZipFile(self._out, 'w', zipfile.ZIP_STORED)
+        else:
+            self._tar = tarfile.open(fileobj=self._out, mode='w', format=tarfile.PAX_FORMAT)
+
+    def add(self, name, data):
+        """Grava um membro e retorna os campos que permitem ao import detectar alterações."""
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, time.localtime(self._mtime)[:6])
+            self._zip.writestr(info, data)
+            return {"crc32": info.CRC}
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = self._mtime
+        self._tar.addfile(info, io.BytesIO(data))
+        return {"file_size": info.size, "mtime_ns": self._mtime * 10**9}
+
+    def close(self, ignore_errors=False):
+        """Finaliza o pacote (ignore_errors=True quando a gravação foi interrompida)."""
+        try:
+            if self._zip is not None:
+                self._zip.close()
+            else:
+                self._tar.close()
+            self._out.flush()
+            self._out.detach()
+        except Exception:
+            if not ignore_errors:
+                raise
+
+def extract_bundle(input_file, bundle_path, lang="pt", workers=1, hash_algo="sha256", progress_callback=None,
+                   cancel_event=None, patterns=None, metrics=None, memory_limit=PIPELINE_MEMORY):
+    """Extrai as entradas para um único pacote .zip ou .tar (sem compressão) com o _manifest.json.
+
+    Equivale a extract_pod5 gravando em bundle_path (o formato vem da extensão). No .zip o
+    manifesto guarda o CRC32 de cada membro e no .tar o tamanho e o mtime, para que
+    import_pod5 leia só os membros alterados. O pacote é gravado atomicamente.
+    Retorna o mesmo resumo de extract_pod5.
+    """
+    fmt = _bundle_format(bundle_path)
+    _new_hasher(hash_algo)  # valida o algoritmo antes de extrair
+    metrics = metrics or Metrics()
+
+    with PodArchive(input_file, metrics) as archive:
+        entries = [archive[i] for i in archive.select(patterns)]
+        with _atomic_output(bundle_path) as out:
+            writer = _BundleWriter(out, fmt, time.time())
+            try:
+                done, dedup_saved = _extract_entries(archive, entries, lambda entry, data: writer.add(entry.name, data),
+                                                     hash_algo, workers, memory_limit, metrics, progress_callback,
+                                                     cancel_event)
+                manifest = [done[entry.index][0] if entry.index in done else _manifest_item(entry)
+                            for entry in archive]
+                with metrics.phase("manifest"):
+                    writer.add(MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+            except BaseException:
+                writer.close(ignore_errors=True)  # o temporário é descartado por _atomic_output
+                raise
+            writer.close()
+
+    written = [item["original_size"] for item, extracted in done.values() if extracted]
+    return {"entries": len(done), "written": len(written), "bytes": sum(written),
+            "skipped": 0, "skipped_bytes": 0, "dedup_saved": dedup_saved}
+
+class _FolderSource:
+    """Origem do import em uma pasta: alterações detectadas pelo stat e, se preciso, pelo hash."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, item):
+        return os.path.join(self.directory, item['name'])
+
+    def check(self, item):
+        """Retorna (modificado, stat do arquivo ou None se a entrada não foi extraída)."""
+        path = self.path(item)
+        if item.get('hash') is None and not os.path.exists(path):
+            return False, None  # entrada não extraída (extração seletiva): permanece como no original
+        try:
+            return _file_changed(item, path)
+        except Exception as e:
+            raise Exception(f"Erro ao ler '{item['name']}': {e}")
+
+    def load(self, item):
+        """Lê o arquivo; retorna (dados, stat tirado antes da leitura)."""
+        with open(self.path(item), 'rb') as f:
+            st = os.fstat(f.fileno())
+            return f.read(), st
+
+    def close(self):
+        pass
+
+class _Bundle:
+    """Origem do import em um pacote: membros inalterados (ver unchanged) não são lidos."""
+
+    def check(self, item):
+        member = self.members.get(item['name'])
+        if member is None:
+            if item.get('hash') is None:
+                return False, None  # entrada não extraída (extração seletiva)
+            raise ValueError(f"Erro ao ler '{item['name']}': ausente do pacote")
+        unchanged = self.unchanged(item, member)
+        if unchanged is None:
+            data = self.read(item['name'])
+            unchanged = calculate_hash(data, item.get('hash_algo', 'sha256')) == item['hash']
+        return not unchanged, None
+
+    def load(self, item):
+        return self.read(item['name']), None
+
+class _ZipBundle(_Bundle):
+    """Leitura de um pacote .zip: alterações detectadas pelo CRC32 e tamanho do diretório central."""
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path)
+        self.members = {info.filename: info for info in self._zip.infolist() if not info.is_dir()}
+
+    def unchanged(self, item, member):
+        if 'crc32' not in item:
+            return None
+        return member.CRC == item['crc32'] and member.file_size == item['original_size']
+
+    def read(self, name):
+        return self._zip.read(self.members[name])
+
+    def close(self):
+        self._zip.close()
+
+class _TarBundle(_Bundle):
+    """Leitura de um pacote .tar: alterações detectadas pelo tamanho e mtime do cabeçalho."""
+
+    def __init__(self, path):
+        self._tar = tarfile.open(path)
+        self.members = {member.name: member for member in self._tar.getmembers() if member.isfile()}
+        self._lock = threading.Lock()
+
+    def unchanged(self, item, member):
+        if 'mtime_ns' not in item:
+            return None
+        return member.size == item.get('file_size') and member.mtime * 10**9 == item['mtime_ns']
+
+    def read(self, name):
+        with self._lock:  # tarfile não pode ser lido por várias threads ao mesmo tempo
+            return self._tar.extractfile(self.members[name]).read()
+
+    def close(self):
+        self._tar.close()
+
+def _open_bundle(path):
+    if zipfile.is_zipfile(path):
+        return _ZipBundle(path)
+    if tarfile.is_tarfile(path):
+        return _TarBundle(path)
+    raise ValueError(f"Pacote inválido: '{path}'")
+
+def _import_bundle(original_file, bundle_path, progress_callback, workers, compress_level, in_place,
+                   cancel_event, metrics):
+    """import_pod5 a partir de um pacote .zip/.tar com o _manifest.json.
+
+    Os membros cujo CRC32 (zip) ou tamanho e mtime (tar) conferem com o manifesto não são
+    lidos; os demais são lidos e comparados pelo hash. O manifesto vem do próprio pacote
+    (manifest_path é ignorado) e o modo in_place não é suportado, pois ele não pode ser
+    atualizado.
+    """
+    if in_place:
+        raise ValueError("O modo in_place não é suportado com pacotes .zip/.tar")
+    bundle = _open_bundle(bundle_path)
+    try:
+        with metrics.phase("manifest"):
+            if MANIFEST_NAME not in bundle.members:
+                raise ValueError(f"Manifesto não encontrado no pacote: '{bundle_path}'")
+            manifest = json.loads(bundle.read(MANIFEST_NAME))
+
+        modified, _ = _scan_modified(bundle, manifest, workers, cancel_event, metrics)
+        if not modified:
+            return False
+        updates = _prepare_updates(bundle, modified, compress_level, workers, progress_callback, cancel_event,
+                                   metrics)
+        return {"modified": len(modified), "dedup_saved": _write_new_pod(original_file, updates, metrics)}
+    finally:
+        bundle.close()
+
+def repack_pod5(input_file, output_file=None, alignment=1, progress_callback=None, cancel_event=None):
+    """Regrava o POD apenas com os dados das entradas vivas, na ordem da tabela.
+
+    Remove o espaço morto deixado por importações anteriores. Entradas que apontam para o
+    mesmo trecho continuam compartilhando os dados. Cada payload começa em um múltiplo de
+    alignment. Sem output_file o próprio input_file é substituído (atomicamente).
+    Retorna um dicionário com old_size, new_size e reclaimed.
+    """
+    if alignment < 1:
+        raise ValueError("Alinhamento inválido")
+    if output_file is None:
+        output_file = input_file
+
+    with _atomic_output(output_file, mode_from=input_file) as out:
+        with PodArchive(input_file) as archive:
+            old_size = archive.file_size
+            entry_size = archive.entry_size
+            table = bytearray(archive.read_range(archive.info_off, archive.names_off - archive.info_off))
+
+            # Cabeçalho: tudo o que vem antes do primeiro payload
+            data_start = min((e.offset for e in archive if e.zsize), default=archive.info_off)
+            archive.copy_range(out, 0, min(data_start, archive.info_off))
+
+            written = {}
+            total = len(archive)
+            for idx, entry in enumerate(archive):
+                _check_cancel(cancel_event)
+                key = (entry.offset, entry.zsize)
+                if key not in written:
+                    padding = -out.tell() % alignment
+                    if padding:
+                        _write_all(out, b'\x00' * padding)
+                    written[key] = out.tell()
+                    archive.copy_range(out, entry.offset, entry.zsize)
+                _set_entry(table, entry_size, entry.index, entry.zsize, written[key], entry.size)
+                if progress_callback:
+                    progress_callback((idx + 1) / total * 100, "")
+
+            _write_table(out, table)
+            archive.copy_range(out, archive.names_off, archive.names_size)
+            new_size = out.tell()
+
+    return {"old_size": old_size, "new_size": new_size, "reclaimed": old_size - new_size}
+
+# ==================================================
+# Patches (só as entradas alteradas, aplicáveis sobre o POD original)
+# ==================================================
+
+PATCH_MAGIC = b'POD5PTCH'
+PATCH_VERSION = 1
+# magic, versão, tamanho e blake2b do POD base, count, entry_size, número de registros
+_PATCH_HEADER = struct.Struct('<8sIQ64sIII')
+# index, zsize, size, índice da entrada cujo payload é compartilhado (-1: payload a seguir)
+_PATCH_RECORD = struct.Struct('<IIIi')
+
+def _same_range(a, b, a_off, b_off, size):
+    """Compara trechos de dois PodArchive em blocos de COPY_CHUNK."""
+    for pos in range(0, size, COPY_CHUNK):
+        n = min(COPY_CHUNK, size - pos)
+        if a.read_range(a_off + pos, n) != b.read_range(b_off + pos, n):
+            return False
+    return True
+
+def make_patch(base_file, new_file, patch_file, progress_callback=None, cancel_event=None):
+    """Grava em patch_file as diferenças de new_file (ex.: um *_new.pod) em relação a base_file.
+
+    Os dois POD devem ter as mesmas entradas e nomes. O patch guarda o tamanho e o blake2b
+    de base_file e, para cada entrada cuja linha da tabela ou cujos dados mudaram, a nova
+    linha e o payload (uma única vez para entradas que compartilham dados). Os payloads são
+    copiados de arquivo para arquivo, sem carregar os POD na memória.
+    Retorna um dicionário com entries, payload_bytes e patch_size.
+    """
+    with PodArchive(base_file) as base, PodArchive(new_file) as new:
+        if (len(base) != len(new) or base.entry_size != new.entry_size or base.names_size != new.names_size
+                or base.read_range(base.names_off, base.names_size) != new.read_range(new.names_off, new.names_size)):
+            raise ValueError("Os arquivos POD não têm as mesmas entradas")
+
+        changed = []
+        for old, cur in _with_progress(zip(base, new), len(base), progress_callback, cancel_event):
+            if (old.zsize, old.offset, old.size) != (cur.zsize, cur.offset, cur.size):
+                changed.append(cur)
+            elif not _same_range(base, new, old.offset, cur.offset, cur.zsize):
+                changed.append(cur)
+
+        base_digest = bytes.fromhex(calculate_file_hash(base_file, "blake2b"))
+        first_by_range = {}
+        payload_bytes = 0
+        with _atomic_output(patch_file) as out:
+            _write_all(out, _PATCH_HEADER.pack(PATCH_MAGIC, PATCH_VERSION, base.file_size, base_digest,
+                                                   len(base), base.entry_size, len(changed)))
+            for entry in changed:
+                _check_cancel(cancel_event)
+                shared = first_by_range.setdefault((entry.offset, entry.zsize), entry.index)
+                if shared != entry.index:
+                    _write_all(out, _PATCH_RECORD.pack(entry.index, entry.zsize, entry.size, shared))
+                else:
+                    _write_all(out, _PATCH_RECORD.pack(entry.index, entry.zsize, entry.size, -1))
+                    new.copy_range(out, entry.offset, entry.zsize)
+                    payload_bytes += entry.zsize
+            patch_size = out.tell()
+
+    return {"entries": len(changed), "payload_bytes": payload_bytes, "patch_size": patch_size}
+
+def apply_patch(input_file, patch_file, output_file=None, in_place=False, progress_callback=None,
+                cancel_event=None):
+    """Aplica em input_file um patch gerado por make_patch.
+
+    O patch só é aceito se tamanho e blake2b de input_file forem os do POD base. Por padrão
+    gera <input>_new.pod (ou output_file); com in_place=True altera o próprio input_file
+    (ver _patch_in_place). Os payloads são copiados do patch em fluxo.
+    Retorna um dicionário com entries e output.
+    """
+    with open(patch_file, 'rb') as patch:
+        patch_size = os.fstat(patch.fileno()).st_size
+        try:
+            magic, version, base_size, base_digest, count, entry_size, records = _PATCH_HEADER.unpack(
+                patch.read(_PATCH_HEADER.size))
+        except struct.error:
+            raise ValueError("Arquivo de patch inválido")
+        if magic != PATCH_MAGIC or version != PATCH_VERSION:
+            raise ValueError("Arquivo de patch inválido")
+        if (base_size != os.path.getsize(input_file)
+                or base_digest != bytes.fromhex(calculate_file_hash(input_file, "blake2b"))):
+            raise ValueError("O patch não corresponde a este arquivo POD")
+
+        # Registros: só as posições dos payloads são guardadas
+        updates = []
+        payloads = {}
+        for _ in range(records):
+            try:
+                index, zsize, size, shared = _PATCH_RECORD.unpack(patch.read(_PATCH_RECORD.size))
+            except struct.error:
+                raise ValueError("Arquivo de patch truncado")
+            if index >= count or (shared >= 0 and shared not in payloads):
+                raise ValueError("Arquivo de patch inválido")
+            if shared < 0:
+                payloads[index] = _FileSlice(patch, patch.tell(), zsize)
+                patch.seek(zsize, io.SEEK_CUR)
+                shared = index
+            updates.append((index, payloads[shared], size, shared))
+        if patch.tell() != patch_size:
+            raise ValueError("Arquivo de patch truncado")
+
+        updates = _with_progress(updates, len(updates), progress_callback, cancel_event)
+        if in_place:
+            output_file = input_file
+            _patch_in_place(input_file, list(updates))
+        else:
+            if output_file is None:
+                output_file = f"{os.path.splitext(input_file)[0]}_new.pod"
+            with PodArchive(input_file) as archive:
+                with _atomic_output(output_file, mode_from=input_file) as out:
+                    _rebuild_archive(archive, out, updates)
+
+    return {"entries": records, "output": output_file}
+
+def _check_payload(archive, offset, zsize, size, algos):
+    """Lê um trecho em blocos, descomprimindo-o em fluxo se zsize != size.
+
+    Retorna (erro ou None, {algoritmo: hash}); a memória usada não depende do tamanho da entrada.
+    """
+    hashers = {algo: _new_hasher(algo) for algo in algos}
+
+    def feed(data):
+        for hasher in hashers.values():
+            hasher.update(data)
+
+    total = 0
+    if zsize == size:
+        for pos in range(0, zsize, COPY_CHUNK):
+            feed(archive.read_range(offset + pos, min(COPY_CHUNK, zsize - pos)))
+        total = zsize
+    else:
+        inflater = zlib.decompressobj()
+        try:
+            for pos in range(0, zsize, COPY_CHUNK):
+                pending = archive.read_range(offset + pos, min(COPY_CHUNK, zsize - pos))
+                while pending and not inflater.eof:
+                    data = inflater.decompress(pending, COPY_CHUNK)
+                    pending = inflater.unconsumed_tail
+                    total += len(data)
+                    feed(data)
+            while not inflater.eof:
+                data = inflater.decompress(b'', COPY_CHUNK)
+                if not data:
+                    break
+                total += len(data)
+                feed(data)
+        except zlib.error as e:
+            return f"erro de descompressão ({e})", {}
+        if not inflater.eof:
+            return "dados comprimidos truncados", {}
+    if total != size:
+        return f"tamanho {total} diferente do esperado {size}", {}
+    return None, {algo: hasher.hexdigest() for algo, hasher in hashers.items()}
+
+def _partial_overlaps(archive):
+    """Pares de entradas cujos trechos se sobrepõem sem serem idênticos (trechos idênticos são
+    dados compartilhados, gerados pela deduplicação)."""
+    pairs = []
+    last = None  # (offset, zsize, índice) do trecho que termina mais adiante até aqui
+    for offset, zsize, index in sorted(zip(archive._offsets, archive._zsizes, range(len(archive)))):
+        if last is not None and offset < last[0] + last[1] and (offset, zsize) != last[:2]:
+            pairs.append((last[2], index))
+        if zsize and (last is None or offset + zsize > last[0] + last[1]):
+            last = (offset, zsize, index)
+    return pairs
+
+def verify_pod5(input_file, manifest_path=None, workers=1, progress_callback=None, cancel_event=None):
+    """Confere a integridade de um POD sem extrair nada.
+
+    Verifica se cada trecho (offset, zsize) está dentro da área de dados (antes de
+    info_off), se há trechos parcialmente sobrepostos, se cada nome começa dentro do bloco
+    de nomes e termina nele, e descomprime em fluxo cada entrada para conferir o tamanho.
+    Com manifest_path, o hash de cada entrada também é comparado com o do manifesto.
+    Trechos compartilhados são lidos uma única vez. Nada é gravado em disco.
+    Retorna um dicionário com o número de entradas, de trechos compartilhados e a lista
+    de erros encontrados.
+    """
+    expected = {}
+    if manifest_path:
+        with open(manifest_path, 'r') as mf:
+            expected = {item['index']: item for item in json.load(mf)}
+
+    with PodArchive(input_file) as archive:
+        errors = []
+
+        # Estrutura: trechos e nomes (só a tabela e o bloco de nomes são lidos)
+        names = archive.read_range(archive.names_off, archive.names_size)
+        groups = {}
+        for entry in archive:
+            if entry.offset + entry.zsize > archive.info_off:
+                errors.append(f"{entry.name or entry.index}: dados fora da área de dados "
+                              f"(offset {entry.offset}, zsize {entry.zsize}, info_off {archive.info_off})")
+            else:
+                groups.setdefault((entry.offset, entry.zsize, entry.size), []).append(entry)
+            if entry.name_off >= archive.names_size or names.find(b'\x00', entry.name_off) < 0:
+                errors.append(f"entrada {entry.index}: nome fora do bloco de nomes (offset {entry.name_off})")
+        for a, b in _partial_overlaps(archive):
+            errors.append(f"{archive.names[a]}: dados sobrepostos aos de {archive.names[b]}")
+
+        # Conteúdo: cada trecho é descomprimido nas threads e comparado com o manifesto
+        def check(key):
+            group = groups[key]
+            algos = {expected[e.index].get('hash_algo', 'sha256') for e in group
+                     if expected.get(e.index, {}).get('hash')}
+            error, hashes = _check_payload(archive, *key, algos)
+            if error:
+                return [f"{entry.name}: {error}" for entry in group]
+            return [f"{entry.name}: hash diferente do manifesto" for entry in group
+                    if expected.get(entry.index, {}).get('hash')
+                    and hashes[expected[entry.index].get('hash_algo', 'sha256')] != expected[entry.index]['hash']]
+
+        results = _map_workers(check, list(groups), workers)
+        for group_errors in _with_progress(results, len(groups), progress_callback, cancel_event):
+            errors.extend(group_errors)
+        shared = sum(len(group) - 1 for group in groups.values())
+        return {"entries": len(archive), "shared": shared, "errors": errors}
+
+class NameIndex:
+    """Índice em memória dos nomes das entradas, para busca por prefixo, substring ou glob.
+
+    A busca não diferencia maiúsculas de minúsculas e retorna os índices em ordem crescente.
+    """
+
+    def __init__(self, names):
+        self._lower = [name.lower() for name in names]
+        self._order = sorted(range(len(self._lower)), key=self._lower.__getitem__)
+        self._keys = [self._lower[i] for i in self._order]
+
+    def __len__(self):
+        return len(self._lower)
+
+    def prefix(self, prefix):
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + '\U0010ffff', start)
+        return sorted(self._order[start:end])
+
+    def search(self, pattern):
+        pattern = pattern.strip().lower()
+        if not pattern:
+            return list(range(len(self._lower)))
+        magic = [c for c in pattern if c in "*?["]
+        if magic == ["*"] and pattern.endswith("*"):
+            return self.prefix(pattern[:-1])
+        if magic:
+            match = re.compile(fnmatch.translate(pattern)).match
+            return [i for i, name in enumerate(self._lower) if match(name)]
+        return [i for i, name in enumerate(self._lower) if pattern in name]
+
+def list_pod_files(input_file):
+    """Retorna uma lista de dicionários com informações de cada entrada do arquivo POD."""
+    with PodArchive(input_file) as archive:
+        return [{
+            "index": entry.index,
+            "name": entry.name,
+            "zsize": entry.zsize,
+            "size": entry.size,
+            "offset": entry.offset,
+            "compressed": (entry.zsize != entry.size)
+        } for entry in archive]
@@ -0,0 +1,338 @@
+"""Índice de texto persistente para localizar strings dentro das entradas de vários POD.
+
+Para cada termo (3 ou mais letras e dígitos, em ASCII/Latin-1 ou UTF-16LE) de cada entrada,
+o banco SQLite guarda uma linha (termo, entrada, bytes por caractere, offsets em bytes nos
+dados descomprimidos). Entradas binárias (ver _looks_like_text) não têm termos. O índice é
+atualizado por arquivo: um POD com o mesmo tamanho e mtime é ignorado, e nos demais só as
+entradas cuja linha da tabela mudou são relidas.
+"""
+import os
+import re
+import sys
+import bisect
+import sqlite3
+from array import array
+
+from pod5_core import PodArchive, _U32, _check_cancel, default_cache_dir
+
+# Termos com 3 a 64 caracteres; em UTF-16LE cada caractere é seguido de um byte nulo
+_TOKEN = re.compile(rb'[0-9A-Za-z\xc0-\xff]{3,64}')
+_TOKEN_UTF16 = re.compile(rb'(?:[0-9A-Za-z\xc0-\xff]\x00){3,64}')
+# Bytes mantidos entre um bloco e o próximo, para não cortar um termo ao meio
+_CARRY = 64 * 2 + 2
+READ_CHUNK = 1024 * 1024
+# Só entradas cujo início parece texto são indexadas: ao menos TEXT_RATIO dos primeiros
+# TEXT_SAMPLE bytes devem ser ASCII imprimível (seguido ou não do byte nulo do UTF-16LE)
+TEXT_SAMPLE = 4096
+TEXT_RATIO = 0.7
+_TEXT_CHAR = re.compile(rb'[\x20-\x7e\t\n\r]\x00?')
+COMMIT_ENTRIES = 256
+# Máximo de caracteres entre o fim de um termo e o início do seguinte em uma frase: com
+# termos de 3 ou mais caracteres, nenhum outro termo (mais os separadores) cabe nesse espaço
+PHRASE_GAP = 4
+# Acima disso a contagem de entradas para ao escolher o termo mais raro da consulta
+_COUNT_CAP = 100000
+
+SCHEMA_VERSION = 3
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    file_size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    archive_id INTEGER NOT NULL REFERENCES archives(id),
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    zsize INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    UNIQUE (archive_id, idx)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (token, entry_id, width)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry_id, width);
+"""
+
+def default_index_path():
+    return os.path.join(default_cache_dir(), "search.sqlite")
+
+def _normalize(raw, width):
+    return raw[::width].decode('latin-1').lower()
+
+def _looks_like_text(sample):
+    """Indica se sample parece texto em ASCII/Latin-1 ou UTF-16LE (ver TEXT_RATIO)."""
+    text = sum(map(len, _TEXT_CHAR.findall(sample)))
+    return bool(sample) and text >= TEXT_RATIO * len(sample)
+
+def iter_tokens(reader):
+    """Gera (termo, offset, largura) de cada ocorrência nos dados lidos de reader em blocos de READ_CHUNK.
+
+    A largura é o número de bytes por caractere: 1 em ASCII/Latin-1, 2 em UTF-16LE.
+    """
+    patterns = ((_TOKEN, 1), (_TOKEN_UTF16, 2))
+    resume = [0] * len(patterns)  # posição absoluta a partir da qual cada padrão continua
+    buf = b''
+    base = 0  # posição absoluta de buf[0]
+    while True:
+        chunk = reader.read(READ_CHUNK)
+        buf += chunk
+        # Sem chunk os dados acabaram; senão um termo que chega perto do fim pode continuar
+        tail = len(buf) - _CARRY if chunk else len(buf)
+        for k, (pattern, width) in enumerate(patterns):
+            start = resume[k] - base
+            for match in pattern.finditer(buf, start):
+                if match.end() > tail:
+                    break
+                yield _normalize(match.group(), width), base + match.start(), width
+                start = match.end()
+            resume[k] = base + max(start, tail - _CARRY)
+        if not chunk:
+            return
+        keep = min(resume) - base
+        if keep > 0:
+            buf = buf[keep:]
+            base += keep
+
+def _pack_positions(positions):
+    """Offsets de um termo em uma entrada, como uint32 little-endian (uma linha por termo)."""
+    values = array(_U32, positions)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+def _unpack_positions(blob):
+    values = array(_U32)
+    values.frombytes(blob)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+def _query_terms(query):
+    """Termos da consulta (um '*' no final de um termo indica prefixo)."""
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        raw = word.rstrip("*").encode('latin-1', 'ignore')
+        tokens = [_normalize(m.group(), 1) for m in _TOKEN.finditer(raw)]
+        terms.extend((token, False) for token in tokens[:-1])
+        if tokens:
+            terms.append((tokens[-1], prefix))
+    return terms
+
+def _term_matches(token, term, prefix):
+    return token.startswith(term) if prefix else token == term
+
+class TextIndex:
+    """Índice invertido posicional em SQLite (um arquivo .sqlite para vários POD).
+
+    A conexão pertence à thread que criou o objeto; use um TextIndex por thread.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # Índice de uma versão anterior: é só um cache, então é recriado do zero
+            self._db.executescript("DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS entries; "
+                                   "DROP TABLE IF EXISTS archives;")
+        self._db.executescript(_SCHEMA)
+        self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, paths, progress_callback=None, cancel_event=None):
+        """Indexa (ou atualiza) os POD em paths.
+
+        Retorna um dicionário com os arquivos processados, as entradas indexadas, as
+        binárias (registradas sem termos), as mantidas sem releitura e as removidas.
+        """
+        summary = {"archives": 0, "indexed": 0, "binary": 0, "kept": 0, "removed": 0}
+        for path in paths:
+            path = os.path.abspath(path)
+            st = os.stat(path)
+            db = self._db
+            row = db.execute("SELECT id, file_size, mtime_ns FROM archives WHERE path = ?", (path,)).fetchone()
+            summary["archives"] += 1
+            if row and (row[1], row[2]) == (st.st_size, st.st_mtime_ns):
+                summary["kept"] += db.execute("SELECT COUNT(*) FROM entries WHERE archive_id = ?",
+                                              (row[0],)).fetchone()[0]
+                continue
+
+            # Transações a cada COMMIT_ENTRIES entradas: uma indexação interrompida continua de
+            # onde parou, pois o tamanho e o mtime do arquivo só são gravados no final
+            with PodArchive(path) as archive:
+                if row:
+                    archive_id = row[0]
+                else:
+                    with db:
+                        archive_id = db.execute("INSERT INTO archives (path, file_size, mtime_ns) VALUES (?, ?, 0)",
+                                                (path, st.st_size)).lastrowid
+                stored = {idx: (entry_id, rest) for entry_id, idx, *rest in db.execute(
+                    "SELECT id, idx, name, offset, zsize, size FROM entries WHERE archive_id = ?", (archive_id,))}
+
+                try:
+                    for i, entry in enumerate(archive):
+                        _check_cancel(cancel_event)
+                        old = stored.pop(entry.index, None)
+                        if old and old[1] == [entry.name, entry.offset, entry.zsize, entry.size]:
+                            summary["kept"] += 1
+                            continue
+                        if old:
+                            self._delete_entry(old[0])
+                        entry_id = db.execute(
+                            "INSERT INTO entries (archive_id, idx, name, offset, zsize, size) VALUES (?, ?, ?, ?, ?, ?)",
+                            (archive_id, entry.index, entry.name, entry.offset, entry.zsize, entry.size)).lastrowid
+                        with archive.open_entry(entry.index) as reader:
+                            # Entradas binárias ficam registradas, mas sem termos
+                            text = _looks_like_text(reader.read(TEXT_SAMPLE))
+                            if text:
+                                reader.seek(0)
+                                occurrences = {}
+                                for token, pos, width in iter_tokens(reader):
+                                    occurrences.setdefault((token, width), []).append(pos)
+                                db.executemany("INSERT INTO postings (token, entry_id, width, positions) "
+                                               "VALUES (?, ?, ?, ?)",
+                                               ((token, entry_id, width, _pack_positions(positions))
+                                                for (token, width), positions in occurrences.items()))
+                        summary["indexed" if text else "binary"] += 1
+                        if (summary["indexed"] + summary["binary"]) % COMMIT_ENTRIES == 0:
+                            db.commit()
+                        if progress_callback:
+                            progress_callback((i + 1) / len(archive) * 100, "")
+                except BaseException:
+                    db.rollback()
+                    raise
+
+                with db:
+                    for entry_id, _ in stored.values():
+                        self._delete_entry(entry_id)
+                    db.execute("UPDATE archives SET file_size = ?, mtime_ns = ? WHERE id = ?",
+                               (st.st_size, st.st_mtime_ns, archive_id))
+                summary["removed"] += len(stored)
+        return summary
+
+    def _delete_entry(self, entry_id):
+        self._db.execute("DELETE FROM postings WHERE entry_id = ?", (entry_id,))
+        self._db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def prune(self):
+        """Remove do índice os POD que não existem mais; retorna quantos foram removidos."""
+        removed = 0
+        with self._db as db:
+            for archive_id, path in db.execute("SELECT id, path FROM archives").fetchall():
+                if not os.path.exists(path):
+                    db.execute("DELETE FROM postings WHERE entry_id IN "
+                               "(SELECT id FROM entries WHERE archive_id = ?)", (archive_id,))
+                    db.execute("DELETE FROM entries WHERE archive_id = ?", (archive_id,))
+                    db.execute("DELETE FROM archives WHERE id = ?", (archive_id,))
+                    removed += 1
+        return removed
+
+    @staticmethod
+    def _term_sql(term, prefix):
+        """Condição SQL (e parâmetros) que seleciona o termo, ou os termos com esse prefixo."""
+        if prefix:
+            return "token >= ? AND token < ?", (term, term + "\uffff")
+        return "token = ?", (term,)
+
+    def _count(self, term, prefix):
+        """Número de entradas com o termo (limitado a _COUNT_CAP)."""
+        where, params = self._term_sql(term, prefix)
+        return self._db.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE {where} LIMIT ?)",
+                                params + (_COUNT_CAP,)).fetchone()[0]
+
+    def _positions(self, entry_id, width, term, prefix):
+        """Ocorrências do termo (ou dos termos com o prefixo) na entrada: offsets e tamanhos em ordem."""
+        where, params = self._term_sql(term, prefix)
+        pairs = []
+        for token, blob in self._db.execute(
+                f"SELECT token, positions FROM postings WHERE entry_id = ? AND width = ? AND {where}",
+                (entry_id, width) + params):
+            pairs.extend((pos, len(token) * width) for pos in _unpack_positions(blob))
+        pairs.sort()
+        return [pos for pos, _ in pairs], [length for _, length in pairs]
+
+    @staticmethod
+    def _phrase_start(following, preceding, pos, length, gap):
+        """Offset do primeiro termo se a frase casa em torno da ocorrência em pos, senão None.
+
+        following e preceding são as ocorrências (ver _positions) dos termos depois e antes
+        do termo em pos, do mais próximo ao mais distante. Cada termo tem de começar no
+        máximo gap bytes depois do fim do anterior.
+        """
+        end = pos + length
+        for positions, lengths in following:
+            i = bisect.bisect_left(positions, end)
+            if i == len(positions) or positions[i] > end + gap:
+                return None
+            end = positions[i] + lengths[i]
+        start = pos
+        for positions, lengths in preceding:
+            # Ocorrência mais próxima que começa antes de start
+            i = bisect.bisect_left(positions, start) - 1
+            if i < 0 or positions[i] + lengths[i] < start - gap:
+                return None
+            start = positions[i]
+        return start
+
+    def search(self, query, archives=None, limit=1000):
+        """Procura query (um ou mais termos, em sequência) e retorna até limit ocorrências.
+
+        Cada resultado é um dicionário com archive, index, name e offset (posição do
+        primeiro termo nos dados descomprimidos da entrada). archives restringe a busca
+        a esses POD. Palavras com menos de 3 caracteres não são indexadas e são ignoradas.
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return []
+
+        # A busca parte das entradas com o termo mais raro e confere os vizinhos de cada ocorrência
+        anchor = min(range(len(terms)), key=lambda k: self._count(*terms[k]))
+        where, params = self._term_sql(*terms[anchor])
+        sql = ("SELECT p.entry_id, p.token, p.width, p.positions, a.path, e.idx, e.name FROM postings p "
+               "CROSS JOIN entries e ON e.id = p.entry_id CROSS JOIN archives a ON a.id = e.archive_id "
+               f"WHERE p.{where}")
+        if archives is not None:
+            paths = [os.path.abspath(path) for path in archives]
+            sql += " AND a.path IN (%s)" % ",".join("?" * len(paths))
+            params += tuple(paths)
+
+        results = []
+        for entry_id, token, width, blob, path, idx, name in self._db.execute(sql, params):
+            positions = _unpack_positions(blob)
+            length = len(token) * width
+            if len(terms) > 1:
+                following = [self._positions(entry_id, width, *term) for term in terms[anchor + 1:]]
+                preceding = [self._positions(entry_id, width, *term) for term in reversed(terms[:anchor])]
+            for pos in positions:
+                start = pos
+                if len(terms) > 1:
+                    start = self._phrase_start(following, preceding, pos, length, PHRASE_GAP * width)
+                    if start is None:
+                        continue
+                results.append({"archive": path, "index": idx, "name": name, "offset": start})
+                if len(results) >= limit:
+                    break
+            if len(results) >= limit:
+                break
+        results.sort(key=lambda r: (r["archive"], r["index"], r["offset"]))
+        return results
@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pod5_core
+from pod5_core import (Metrics, PodArchive, _FolderSource, _patch_in_place, _prepare_updates, _write_new_pod,
+                       extract_pod5, import_pod5, verify_pod5)
+from synth_pod5 import generate
+
+def extracted_pod(tmp_path, entries=12):
+    """Gera um POD (metade das entradas comprimidas) e o extrai; retorna (pod, pasta, manifesto)."""
+    pod = str(tmp_path / "a.pod")
+    generate(pod, entries, "fixed:3000", compressed_ratio=0.5, dirs=2)
+    folder = str(tmp_path / "a_extracted")
+    extract_pod5(pod, folder)
+    manifest_path = os.path.join(folder, "_manifest.json")
+    with open(manifest_path) as mf:
+        return pod, folder, manifest_path, json.load(mf)
+
+def edit(folder, item, data):
+    with open(os.path.join(folder, item["name"]), "ab") as f:
+        f.write(data)
+
+def stored_and_compressed(manifest):
+    return [next(item for item in manifest if not item["compressed"]),
+            next(item for item in manifest if item["compressed"])]
+
+def test_file_saved_after_prepare_keeps_prepared_bytes(tmp_path):
+    pod, folder, _, manifest = extracted_pod(tmp_path)
+    items = stored_and_compressed(manifest)
+    for item in items:
+        edit(folder, item, b" first")
+    snapshot = {item["index"]: open(os.path.join(folder, item["name"]), "rb").read() for item in items}
+    updates = list(_prepare_updates(_FolderSource(folder), items, 6, 1, None, None, Metrics()))
+
+    # Arquivos salvos de novo entre a preparação e a gravação
+    for item in items:
+        edit(folder, item, b" second save")
+
+    _write_new_pod(pod, updates, Metrics())
+    patched = str(tmp_path / "b.pod")
+    with open(pod, "rb") as src, open(patched, "wb") as dst:
+        dst.write(src.read())
+    _patch_in_place(patched, updates)
+
+    for path in (str(tmp_path / "a_new.pod"), patched):
+        assert verify_pod5(path)["errors"] == []
+        with PodArchive(path) as archive:
+            for index, data in snapshot.items():
+                assert archive.read(archive[index]) == data
+
+def test_in_place_manifest_hashes_the_imported_bytes(tmp_path, monkeypatch):
+    pod, folder, manifest_path, manifest = extracted_pod(tmp_path)
+    items = stored_and_compressed(manifest)
+    for item in items:
+        edit(folder, item, b" first")
+
+    patch = pod5_core._patch_in_place
+
+    def save_while_patching(path, updates, metrics=None):
+        for item in items:
+            edit(folder, item, b" saved during import")
+        return patch(path, updates, metrics)
+
+    monkeypatch.setattr(pod5_core, "_patch_in_place", save_while_patching)
+    assert import_pod5(pod, folder, manifest_path, in_place=True)["modified"] == 2
+    monkeypatch.setattr(pod5_core, "_patch_in_place", patch)
+
+    assert verify_pod5(pod, manifest_path)["errors"] == []
+    # A edição feita durante o import ainda é encontrada
+    assert import_pod5(pod, folder, manifest_path, in_place=True)["modified"] == 2
+    with PodArchive(pod) as archive:
+        for item in items:
+            with open(os.path.join(folder, item["name"]), "rb") as f:
+                assert archive.read(archive[item["index"]]) == f.read()
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def prepared(folder, manifest, grow):
+    """Altera uma entrada sem mudar o tamanho e, com grow, outra que passa a não caber no lugar."""
+    stored = [item for item in manifest if not item["compressed"]]
+    path = os.path.join(folder, stored[0]["name"])
+    data = read_bytes(path)
+    with open(path, "wb") as f:
+        f.write(b"X" * 10 + data[10:])
+    items = [stored[0]]
+    if grow:
+        edit(folder, stored[1], b" grown")
+        items.append(stored[1])
+    return list(_prepare_updates(_FolderSource(folder), items, 6, 1, None, None, Metrics()))
+
+def test_patch_that_fits_keeps_file_size(tmp_path):
+    pod, folder, _, manifest = extracted_pod(tmp_path)
+    size = os.path.getsize(pod)
+    updates = prepared(folder, manifest, grow=False)
+    placed, _ = _patch_in_place(pod, updates)
+    assert os.path.getsize(pod) == size
+    assert placed[updates[0][0]][1] == manifest[updates[0][0]]["original_offset"]
+    assert verify_pod5(pod)["errors"] == []
+
+def test_interrupted_patch_restores_the_pod(tmp_path, monkeypatch):
+    pod, folder, _, manifest = extracted_pod(tmp_path)
+    updates = prepared(folder, manifest, grow=True)
+    original = read_bytes(pod)
+    write_all = pod5_core._write_all
+    calls = []
+
+    def counting(out, data):
+        calls.append(len(data))
+        return write_all(out, data)
+
+    monkeypatch.setattr(pod5_core, "_write_all", counting)
+    copy = str(tmp_path / "count.pod")
+    with open(copy, "wb") as f:
+        f.write(original)
+    _patch_in_place(copy, updates)
+    total = len(calls)
+    assert total == 5  # payload anexado, tabela, nomes, trecho no lugar e info_off
+
+    # Interrompe a n-ésima gravação (anexo, trecho no lugar ou troca do info_off)
+    for n in range(1, total + 1):
+        calls.clear()
+
+        def failing(out, data):
+            calls.append(len(data))
+            if len(calls) == n:
+                raise KeyboardInterrupt
+            return write_all(out, data)
+
+        monkeypatch.setattr(pod5_core, "_write_all", failing)
+        try:
+            _patch_in_place(pod, updates)
+        except KeyboardInterrupt:
+            pass
+        assert read_bytes(pod) == original, n
+
+def test_written_files_get_default_permissions(tmp_path):
+    pod, folder, manifest_path, _ = extracted_pod(tmp_path)
+    bundle = str(tmp_path / "a.zip")
+    pod5_core.extract_bundle(pod, bundle)
+    expected = 0o666 & ~pod5_core._UMASK
+    for path in (manifest_path, bundle):
+        assert os.stat(path).st_mode & 0o777 == expected
@@ -0,0 +1,94 @@
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pod5_search import READ_CHUNK, TextIndex
+
+ENTRIES = [
+    b"press save level start",
+    b"menu: press   start to continue; press start again",
+    "PRESS START".encode("utf-16-le") + b"\x00\x00press\x00\x00start",
+    b"pressstart start press",
+]
+
+def write_pod(path, payloads):
+    """Grava um POD5 mínimo com as entradas sem compressão (zsize == size)."""
+    with open(path, "wb") as out:
+        out.write(b"POD5" + bytes(0x200 - 4))
+        table = bytearray()
+        names = bytearray()
+        for i, data in enumerate(payloads):
+            table += struct.pack("<4I", len(names), len(data), out.tell(), len(data))
+            names += f"entry_{i}.txt".encode("ascii") + b"\x00"
+            out.write(data)
+        info_off = out.tell()
+        out.write(table)
+        out.write(names)
+        out.seek(0x58)
+        out.write(struct.pack("<I", len(payloads)))
+        out.seek(0x108)
+        out.write(struct.pack("<3I", info_off, 0, len(names)))
+
+def phrase_at(data, offset, words):
+    """Confere em data, a partir de offset, as palavras da frase (em Latin-1 ou UTF-16LE)."""
+    for width, encoding in ((1, "latin-1"), (2, "utf-16-le")):
+        text = data[offset:offset + 256 * width].decode(encoding, "ignore").lower()
+        rest = text
+        for word in words:
+            if not rest.startswith(word):
+                break
+            rest = rest[len(word):].lstrip(" :;\x00")
+        else:
+            return True
+    return False
+
+def test_phrase_offsets_point_at_the_phrase(tmp_path):
+    pod = str(tmp_path / "a.pod")
+    write_pod(pod, ENTRIES)
+    with TextIndex(str(tmp_path / "index.sqlite")) as index:
+        index.update([pod])
+        results = index.search("press start")
+
+    found = sorted((r["index"], r["offset"]) for r in results)
+    assert found == [(1, 6), (1, 33), (2, 0), (2, 24)]
+    for index_, offset in found:
+        assert phrase_at(ENTRIES[index_], offset, ["press", "start"])
+
+def test_single_term_and_prefix(tmp_path):
+    pod = str(tmp_path / "a.pod")
+    write_pod(pod, ENTRIES)
+    with TextIndex(str(tmp_path / "index.sqlite")) as index:
+        index.update([pod])
+        for r in index.search("level"):
+            assert ENTRIES[r["index"]][r["offset"]:r["offset"] + 5] == b"level"
+        offsets = [(r["index"], r["offset"]) for r in index.search("pre*")]
+        assert (3, 0) in offsets
+        phrase = sorted((r["index"], r["offset"]) for r in index.search("press start"))
+        # "pressstart start" também casa com pre* sta*
+        assert sorted((r["index"], r["offset"]) for r in index.search("pre* sta*")) == sorted(phrase + [(3, 0)])
+        assert len(index.search("press", limit=2)) == 2
+        assert index.search("press", archives=[str(tmp_path / "other.pod")]) == []
+
+def test_phrase_across_read_chunks(tmp_path):
+    # Frases que atravessam o fim do primeiro bloco lido por iter_tokens, em Latin-1 e UTF-16LE
+    filler = b"lorem ipsum dolor sit amet "
+    latin = bytearray(filler * (READ_CHUNK // len(filler) + 1))
+    del latin[READ_CHUNK - 3:]
+    latin += b" press start " + filler * 10
+    wide = bytearray(("lorem ipsum dolor sit amet " * (READ_CHUNK // 54 + 1)).encode("utf-16-le"))
+    del wide[READ_CHUNK - 4:]
+    wide += " press start ".encode("utf-16-le") + filler.decode().encode("utf-16-le") * 10
+    entries = [bytes(latin), bytes(wide)]
+    pod = str(tmp_path / "big.pod")
+    write_pod(pod, entries)
+    with TextIndex(str(tmp_path / "index.sqlite")) as index:
+        index.update([pod])
+        results = index.search("press start")
+        assert len(index.search("lorem")) == 1000
+
+    found = sorted((r["index"], r["offset"]) for r in results)
+    assert found == [(0, READ_CHUNK - 2), (1, READ_CHUNK - 2)]
+    for index_, offset in found:
+        assert phrase_at(entries[index_], offset, ["press", "start"])